@@ -3,7 +3,7 @@ Auth API routes: POST /auth/login, GET /auth/me
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_current_user, get_db
@@ -15,6 +15,9 @@ from core.config import get_settings
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 settings = get_settings()
 
+# Statements built once at import; parameters are bound per request
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
@@ -22,14 +25,19 @@ async def login(
     request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(User).where(User.email == body.email))
+    result = await db.execute(USER_BY_EMAIL, {"email": body.email})
     user: User | None = result.scalar_one_or_none()
 
-    if not user or not verify_password(body.password, user.password_hash):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_password(body.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+    if new_hash:
+        user.password_hash = new_hash
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is disabled")
 
@@ -3,12 +3,15 @@ Model health route: GET /model/metrics
 Returns champion model metrics + drift detection flag.
 """
 
+import asyncio
 import json
 import os
 
 from fastapi import APIRouter, Depends
+from fastapi_cache.decorator import cache
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import MODEL_NAMESPACE, static_key_builder
 from core.config import get_settings
 from core.dependencies import get_current_user, get_db
 from ml.evaluate import detect_drift, load_registry
@@ -20,12 +23,13 @@ settings = get_settings()
 
 
 @router.get("/metrics", response_model=ModelMetricsResponse)
+@cache(expire=60, namespace=MODEL_NAMESPACE, key_builder=static_key_builder)
 async def get_model_metrics(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Returns current champion model metrics and drift warning flag."""
-    registry = load_registry()
+    registry = await asyncio.to_thread(load_registry, settings.MODEL_REGISTRY_PATH)
 
     if not registry:
         return ModelMetricsResponse(
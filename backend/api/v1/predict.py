@@ -2,21 +2,45 @@
 Prediction routes: POST /predict (single), POST /predict/batch (JSON array)
 """
 
+import asyncio
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import select
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import invalidate_students
 from core.dependencies import get_current_user, get_db
-from models.db_models import AuditLog, Prediction, Student, User
+from models.db_models import AuditLog, Prediction, User
 from models.schemas import PredictionResponse, StudentInput, TopFactor
-from services.inference import predict_single
+from services.batching import batcher
+from services.inference import predict_batch_vectorized, run_inference
 from services.intervention import get_interventions
-from services.preprocessing import check_missing_ratio, preprocess_record
+from services.persistence import (
+    insert_audit_logs,
+    insert_predictions,
+    prediction_values,
+    upsert_students,
+)
+from services.preprocessing import check_missing_ratio, preprocess_batch, preprocess_record
 
 router = APIRouter(prefix="/predict", tags=["Predictions"])
 
+# Batch bodies are validated in one pydantic-core pass straight from the raw JSON
+_STUDENT_BATCH_ADAPTER = TypeAdapter(list[StudentInput])
+_STUDENT_BATCH_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/StudentInput"}},
+            },
+        },
+    },
+}
+
 
 async def _run_and_persist(
     student_data: StudentInput,
@@ -38,45 +62,27 @@ async def _run_and_persist(
                    "Minimum 70% of fields required.",
         )
 
+    # Single-record preprocessing is microseconds of work — a thread hop would cost more
     X = preprocess_record(record)
-    pred = predict_single(X, record)
+    pred = await batcher.submit(X, record)
     interventions = get_interventions(record, pred["dropout_probability"])
 
-    # Upsert student
-    result = await db.execute(select(Student).where(Student.student_id == student_id))
-    student = result.scalar_one_or_none()
-    if student is None:
-        student = Student(
-            student_id=student_id,
-            age=record.get("age"),
-            gender=record.get("gender"),
-            department=record.get("department"),
-            semester=record.get("semester"),
-        )
-        db.add(student)
-    else:
-        student.updated_at = datetime.now(timezone.utc)
+    # One timestamp for every row written by this request
+    now = datetime.now(timezone.utc)
+
+    # Upsert student (single INSERT ... ON CONFLICT, no read-then-write race)
+    await upsert_students(db, [{
+        "student_id": student_id,
+        "age":        record.get("age"),
+        "gender":     record.get("gender"),
+        "department": record.get("department"),
+        "semester":   record.get("semester"),
+        "created_at": now,
+        "updated_at": now,
+    }])
 
     # Insert prediction
-    prediction_row = Prediction(
-        student_id=student_id,
-        attendance_pct=record.get("attendance_pct"),
-        assignment_score_avg=record.get("assignment_score_avg"),
-        internal_marks_avg=record.get("internal_marks_avg"),
-        semester_gpa=record.get("semester_gpa"),
-        study_hours_per_week=record.get("study_hours_per_week"),
-        participation_score=record.get("participation_score"),
-        prev_semester_gpa=record.get("prev_semester_gpa"),
-        backlogs=record.get("backlogs"),
-        financial_aid=record.get("financial_aid"),
-        performance_category=pred["performance_category"],
-        dropout_probability=pred["dropout_probability"],
-        confidence_score=pred["confidence"],
-        top_factors=pred["top_factors"],
-        recommended_interventions=interventions,
-        model_version=pred["model_version"],
-    )
-    db.add(prediction_row)
+    db.add(Prediction(**prediction_values(record, pred, interventions, predicted_at=now)))
 
     # Audit
     db.add(AuditLog(
@@ -85,20 +91,24 @@ async def _run_and_persist(
         action="GET_PREDICTION",
         detail={"performance_category": pred["performance_category"]},
         ip_address=request.client.host if request.client else None,
+        created_at=now,
     ))
 
-    await db.flush()
+    # Commit before invalidating: a /students read in between would re-cache the old rows
+    await db.commit()
+    await invalidate_students()
 
+    # Inference output is trusted — factors skip validation via model_construct
     return PredictionResponse(
         student_id=student_id,
         performance_category=pred["performance_category"],
         dropout_probability=pred["dropout_probability"],
         confidence=pred["confidence"],
-        top_factors=[TopFactor(**f) for f in pred["top_factors"]],
+        top_factors=[TopFactor.model_construct(**f) for f in pred["top_factors"]],
         recommended_interventions=interventions,
         data_quality_flag=quality_flag,
         model_version=pred["model_version"],
-        predicted_at=datetime.now(timezone.utc),
+        predicted_at=now,
     )
 
 
@@ -113,22 +123,86 @@ async def predict(
     return await _run_and_persist(student, db, current_user, request)
 
 
-@router.post("/batch", response_model=list[PredictionResponse])
+@router.post(
+    "/batch",
+    response_model=list[PredictionResponse],
+    response_class=ORJSONResponse,
+    openapi_extra=_STUDENT_BATCH_BODY,
+)
 async def predict_batch(
-    students: list[StudentInput],
     request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Batch JSON prediction for a list of students."""
+    try:
+        students = _STUDENT_BATCH_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # Same 422 shape FastAPI produces for declared body params
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
     if len(students) > 500:
         raise HTTPException(status_code=400, detail="Batch size limit is 500 per request. Use CSV upload for larger batches.")
 
-    results = []
+    # Missing data check — skip offending rows without failing the batch
+    records = []
     for s in students:
-        try:
-            r = await _run_and_persist(s, db, current_user, request)
-            results.append(r)
-        except HTTPException:
-            continue
-    return results
+        record = s.model_dump()
+        if check_missing_ratio(record) <= 0.30:
+            records.append(record)
+    if not records:
+        return []
+
+    # One preprocessing pass and one model call for the whole batch, both off the event loop.
+    # Every row is explained, so top_factors match what /predict returns for the same student
+    X = await asyncio.to_thread(preprocess_batch, records)
+    preds = await run_inference(predict_batch_vectorized, X, records, True)
+    interventions = [get_interventions(r, p["dropout_probability"]) for r, p in zip(records, preds)]
+
+    # Set-based writes: one upsert for students, one INSERT each for predictions + audit
+    now = datetime.now(timezone.utc)
+    await upsert_students(db, [
+        {
+            "student_id": r["student_id"],
+            "age":        r.get("age"),
+            "gender":     r.get("gender"),
+            "department": r.get("department"),
+            "semester":   r.get("semester"),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for r in records
+    ])
+    await insert_predictions(db, [
+        prediction_values(r, p, i, predicted_at=now) for r, p, i in zip(records, preds, interventions)
+    ])
+    ip_address = request.client.host if request.client else None
+    await insert_audit_logs(db, [
+        {
+            "user_id":    current_user.id,
+            "student_id": r["student_id"],
+            "action":     "GET_PREDICTION",
+            "detail":     {"performance_category": p["performance_category"]},
+            "ip_address": ip_address,
+            "created_at": now,
+        }
+        for r, p in zip(records, preds)
+    ])
+    await db.commit()
+    await invalidate_students()
+
+    return [
+        PredictionResponse(
+            student_id=r["student_id"],
+            performance_category=p["performance_category"],
+            dropout_probability=p["dropout_probability"],
+            confidence=p["confidence"],
+            top_factors=[TopFactor.model_construct(**f) for f in p["top_factors"]],
+            recommended_interventions=i,
+            model_version=p["model_version"],
+            predicted_at=now,
+        )
+        for r, p, i in zip(records, preds, interventions)
+    ]
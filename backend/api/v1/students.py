@@ -3,20 +3,59 @@ Student routes: GET /students (filtered/paginated), GET /students/{student_id}
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import func, select
+from fastapi_cache.decorator import cache
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from core.cache import STUDENTS_NAMESPACE, students_key_builder
 from core.dependencies import get_current_user, get_db
 from models.db_models import AuditLog, Prediction, Student, User
 from models.schemas import (
-    PredictionHistoryItem, PredictionResponse, StudentDetail,
-    StudentListItem, StudentListResponse, TopFactor
+    TOP_FACTORS_ADAPTER, PredictionHistoryItem, PredictionResponse,
+    StudentDetail, StudentListItem, StudentListResponse
 )
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
 
+# ── Statements built once at import; parameters are bound per request ──────────
+# Rank each student's predictions newest-first; rn == 1 is the latest
+_ranked = (
+    select(
+        Prediction,
+        func.row_number().over(
+            partition_by=Prediction.student_id,
+            order_by=Prediction.predicted_at.desc(),
+        ).label("rn"),
+    )
+    .subquery()
+)
+_latest = aliased(Prediction, _ranked)
+
+# Join students → latest prediction; total row count comes from a window
+# over the filtered set so a single round trip returns page + total
+LIST_BASE = (
+    select(Student, _latest, func.count().over().label("total"))
+    .join(
+        _ranked,
+        (_ranked.c.student_id == Student.student_id) & (_ranked.c.rn == 1),
+        isouter=True,
+    )
+)
+
+STUDENT_BY_ID = select(Student).where(Student.student_id == bindparam("student_id"))
+
+PREDICTION_HISTORY = (
+    select(Prediction)
+    .where(Prediction.student_id == bindparam("student_id"))
+    .order_by(Prediction.predicted_at.desc())
+    .limit(20)
+)
+
+
 @router.get("", response_model=StudentListResponse)
+@cache(expire=60, namespace=STUDENTS_NAMESPACE, key_builder=students_key_builder)
 async def list_students(
     risk: str | None = Query(None, description="Filter by performance category: High | Medium | At Risk"),
     department: str | None = Query(None),
@@ -30,31 +69,7 @@ async def list_students(
     Returns paginated student list with their latest prediction.
     Filterable by risk category, department, and semester.
     """
-    # Subquery: latest prediction per student
-    latest_pred_subq = (
-        select(
-            Prediction.student_id,
-            func.max(Prediction.predicted_at).label("max_pred_at"),
-        )
-        .group_by(Prediction.student_id)
-        .subquery()
-    )
-
-    # Join students → latest prediction
-    stmt = (
-        select(Student, Prediction)
-        .join(
-            latest_pred_subq,
-            Student.student_id == latest_pred_subq.c.student_id,
-            isouter=True,
-        )
-        .join(
-            Prediction,
-            (Prediction.student_id == latest_pred_subq.c.student_id) &
-            (Prediction.predicted_at == latest_pred_subq.c.max_pred_at),
-            isouter=True,
-        )
-    )
+    stmt = LIST_BASE
 
     # Filters
     if department:
@@ -62,21 +77,24 @@ async def list_students(
     if semester:
         stmt = stmt.where(Student.semester == semester)
     if risk:
-        stmt = stmt.where(Prediction.performance_category == risk)
-
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
+        stmt = stmt.where(_latest.performance_category == risk)
 
     # Paginate
     stmt = stmt.offset((page - 1) * limit).limit(limit)
     result = await db.execute(stmt)
     rows = result.all()
 
+    if rows:
+        total = rows[0].total
+    elif page > 1:
+        # Page past the end: no row carries the window count, fall back to counting
+        count_stmt = select(func.count()).select_from(stmt.limit(None).offset(None).subquery())
+        total = (await db.execute(count_stmt)).scalar() or 0
+    else:
+        total = 0
+
     data = []
-    for row in rows:
-        student, pred = row
+    for student, pred, _ in rows:
         data.append(StudentListItem(
             student_id=student.student_id,
             department=student.department,
@@ -97,24 +115,19 @@ async def get_student(
     current_user: User = Depends(get_current_user),
 ):
     """Returns full student record with latest prediction and prediction history."""
-    result = await db.execute(select(Student).where(Student.student_id == student_id))
+    result = await db.execute(STUDENT_BY_ID, {"student_id": student_id})
     student = result.scalar_one_or_none()
     if not student:
         raise HTTPException(status_code=404, detail=f"Student '{student_id}' not found")
 
     # Prediction history (latest first)
-    pred_result = await db.execute(
-        select(Prediction)
-        .where(Prediction.student_id == student_id)
-        .order_by(Prediction.predicted_at.desc())
-        .limit(20)
-    )
+    pred_result = await db.execute(PREDICTION_HISTORY, {"student_id": student_id})
     predictions = pred_result.scalars().all()
 
     latest = predictions[0] if predictions else None
     latest_pred_resp = None
     if latest:
-        factors = [TopFactor(**f) for f in (latest.top_factors or [])]
+        factors = TOP_FACTORS_ADAPTER.validate_python(latest.top_factors or [])
         latest_pred_resp = PredictionResponse(
             student_id=student_id,
             performance_category=latest.performance_category,
@@ -3,19 +3,20 @@ CSV Upload route: POST /upload/csv
 Accepts multipart CSV, validates schema, runs batch inference, persists results.
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
-from io import StringIO
 
-import pandas as pd
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import invalidate_students
 from core.dependencies import get_db, require_admin
 from models.db_models import AuditLog, UploadBatch, User
 from models.schemas import BatchError, UploadResponse
 from services.ingestion import (
     deduplicate,
+    parse_csv,
     process_batch,
     validate_csv_schema,
 )
@@ -39,11 +40,10 @@ async def upload_csv(
             detail="Only .csv files are supported",
         )
 
-    content = await file.read()
-
-    # Parse CSV
+    # Parse CSV straight from the spooled upload (memory for small files, disk for large)
+    await file.seek(0)
     try:
-        df = pd.read_csv(StringIO(content.decode("utf-8")))
+        df = await asyncio.to_thread(parse_csv, file.file)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Could not parse CSV: {e}")
 
@@ -97,6 +97,11 @@ async def upload_csv(
         ip_address=request.client.host if request.client else None,
     ))
 
+    # Commit before invalidating, so no /students read can re-cache the old rows
+    await db.commit()
+    if processed:
+        await invalidate_students()
+
     return UploadResponse(
         batch_id=batch_id,
         status=batch.status,
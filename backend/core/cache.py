@@ -0,0 +1,51 @@
+"""
+Response caching for read-heavy endpoints (fastapi-cache2).
+Backed by Redis when REDIS_URL is set, in-process memory otherwise.
+"""
+
+import hashlib
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from core.config import get_settings
+
+settings = get_settings()
+
+CACHE_PREFIX       = "edupredict"
+MODEL_NAMESPACE    = "model"
+STUDENTS_NAMESPACE = "students"
+
+
+def init_cache():
+    """Initialise the cache backend. Called once at application startup."""
+    if settings.REDIS_URL:
+        from fastapi_cache.backends.redis import RedisBackend
+        from redis import asyncio as aioredis
+
+        backend = RedisBackend(aioredis.from_url(settings.REDIS_URL))
+    else:
+        backend = InMemoryBackend()
+    FastAPICache.init(backend, prefix=CACHE_PREFIX)
+
+
+# ── Key builders ───────────────────────────────────────────────────────────────
+# The default builder hashes every endpoint argument, including the DB session
+# and current user, which would make every key unique. These key on the
+# response-shaping inputs only — never on the auth token or user.
+def static_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None) -> str:
+    """Key for responses that are the same for every caller (e.g. model metrics)."""
+    return f"{namespace}:{func.__module__}:{func.__name__}"
+
+
+def students_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None) -> str:
+    """Key the student list on its filter + pagination query params."""
+    kwargs = kwargs or {}
+    params = tuple(kwargs.get(k) for k in ("risk", "department", "semester", "page", "limit"))
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f"{namespace}:{func.__module__}:{func.__name__}:{digest}"
+
+
+async def invalidate_students():
+    """Drop cached student lists. Call after the writing transaction has committed."""
+    await FastAPICache.clear(namespace=STUDENTS_NAMESPACE)
@@ -18,13 +18,30 @@ class Settings(BaseSettings):
     APP_ENV: str = "development"
     SECRET_KEY: str = "dev-secret-key-change-in-production-min-32-chars!!"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    PASSWORD_PEPPER: str = ""     # server-side HMAC key applied before hashing; empty = off
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./students.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30      # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800    # seconds before a connection is replaced
 
     # ML
     MODEL_DIR: str = "./ml/models"
     MODEL_REGISTRY_PATH: str = "./ml/models/model_registry.json"
+    INFERENCE_WORKERS: int | None = None  # None → os.cpu_count(); 0 → no process pool
+    PREDICT_BATCH_MAX: int = 64           # max concurrent /predict calls scored together
+    PREDICT_BATCH_TIMEOUT_MS: float = 5   # max wait to fill a batch
+    FEATURE_DTYPE: str = "float32"        # dtype of feature matrices handed to the model
+    PREPROCESS_PARALLEL_MIN_ROWS: int = 50_000  # uploads this large are preprocessed in parallel chunks
+    PREPROCESS_N_JOBS: int = 2            # joblib workers for those chunks (capped at cpu_count); 1 → serial
+
+    # Uploads: multipart files up to this size stay in memory, larger ones spool to disk
+    UPLOAD_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+
+    # Cache (Redis when set, in-process memory otherwise)
+    REDIS_URL: str = ""
 
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
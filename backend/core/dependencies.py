@@ -6,8 +6,8 @@ from typing import AsyncGenerator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError
-from sqlalchemy import select
+from jwt import InvalidTokenError
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.security import decode_token
@@ -16,6 +16,9 @@ from models.db_models import User
 
 bearer_scheme = HTTPBearer()
 
+# Built once at import; parameters are bound per request
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
 
 # ── Database ───────────────────────────────────────────────────────────────────
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -45,10 +48,10 @@ async def get_current_user(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+    except InvalidTokenError:
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(USER_BY_ID, {"user_id": user_id})
     user = result.scalar_one_or_none()
     if user is None or not user.is_active:
         raise credentials_exception
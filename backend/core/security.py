@@ -1,32 +1,91 @@
 """
-Security utilities: password hashing (bcrypt) and JWT encode/decode.
+Security utilities: password hashing (argon2, legacy bcrypt) and JWT encode/decode.
 """
 
+import asyncio
+import base64
+import hashlib
+import hmac
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from jose import JWTError, jwt
+import jwt
+from cachetools import TTLCache
 from passlib.context import CryptContext
 
 from core.config import get_settings
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+# New hashes use argon2; existing bcrypt hashes still verify and are
+# upgraded transparently on the next successful login. bcrypt is never
+# used for new hashes, so its cost is not configurable.
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+
+# Marks hashes of peppered passwords, so a login never has to try both forms
+PEPPER_PREFIX = "$pepper$"
 
 
 # ── Password ───────────────────────────────────────────────────────────────────
+def _pepper(plain_password: str) -> str:
+    """
+    HMAC-SHA256 the password with the server-side pepper before hashing.
+    The base64 digest (44 chars) also stays under bcrypt's 72-byte limit.
+    No-op when PASSWORD_PEPPER is unset.
+    """
+    if not settings.PASSWORD_PEPPER:
+        return plain_password
+    digest = hmac.new(
+        settings.PASSWORD_PEPPER.encode(), plain_password.encode(), hashlib.sha256
+    ).digest()
+    return base64.b64encode(digest).decode()
+
+
 def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    hashed = pwd_context.hash(_pepper(plain_password))
+    return PEPPER_PREFIX + hashed if settings.PASSWORD_PEPPER else hashed
+
 
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Exactly one hash check per call; the stored hash says whether it was peppered."""
+    if hashed_password.startswith(PEPPER_PREFIX):
+        if not settings.PASSWORD_PEPPER:
+            return False, None  # pepper removed from config → hash can't be checked
+        valid, new_hash = pwd_context.verify_and_update(
+            _pepper(plain_password), hashed_password[len(PEPPER_PREFIX):]
+        )
+        return valid, PEPPER_PREFIX + new_hash if new_hash else None
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    # Hash stored before the pepper was configured → check the raw password
+    # and, if it matches, migrate to a peppered hash
+    valid, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    if valid and settings.PASSWORD_PEPPER:
+        new_hash = hash_password(plain_password)
+    return valid, new_hash
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password without blocking the event loop (hashing is CPU-bound).
+    Returns (is_valid, new_hash); new_hash is set when the stored hash
+    uses a deprecated scheme/cost or predates the pepper and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, _verify_and_update, plain_password, hashed_password
+    )
 
 
 # ── JWT ────────────────────────────────────────────────────────────────────────
 ALGORITHM = "HS256"
 
+# Decoded payloads keyed by raw token, so repeat requests skip the HMAC check.
+# Entries are never served past the token's own exp claim.
+_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_token_cache_lock = threading.Lock()
+
 
 def create_access_token(data: dict[str, Any]) -> str:
     """Create a signed JWT with expiry."""
@@ -40,7 +99,15 @@ def create_access_token(data: dict[str, Any]) -> str:
 
 def decode_token(token: str) -> dict[str, Any]:
     """
-    Decode and validate JWT.
-    Raises JWTError on invalid/expired tokens.
+    Decode and validate JWT (cached per token).
+    Raises jwt.InvalidTokenError on invalid/expired tokens.
     """
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    with _token_cache_lock:
+        payload = _token_cache.get(token)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    with _token_cache_lock:
+        _token_cache[token] = payload
+    return payload
@@ -27,9 +27,15 @@ async def seed():
             print("ℹ️  Admin user already exists.")
             return
 
+        # Hashing is deliberately slow; run both off the event loop concurrently
+        admin_hash, viewer_hash = await asyncio.gather(
+            asyncio.to_thread(hash_password, "Admin@1234"),
+            asyncio.to_thread(hash_password, "Viewer@1234"),
+        )
+
         admin = User(
             email="admin@college.edu",
-            password_hash=hash_password("Admin@1234"),
+            password_hash=admin_hash,
             full_name="System Administrator",
             role="admin",
             is_active=True,
@@ -38,7 +44,7 @@ async def seed():
 
         viewer = User(
             email="viewer@college.edu",
-            password_hash=hash_password("Viewer@1234"),
+            password_hash=viewer_hash,
             full_name="Faculty Viewer",
             role="viewer",
             is_active=True,
@@ -1,10 +1,17 @@
 """
 Async SQLAlchemy engine and session factory.
 Supports SQLite (development) and PostgreSQL (production) via DATABASE_URL env var.
+
+For PostgreSQL use the asyncpg driver (postgresql+asyncpg://...). Behind
+PgBouncer in transaction mode, append ?prepared_statement_cache_size=0 to
+the URL since prepared statements cannot survive connection hand-offs.
 """
 
+import orjson
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool, StaticPool
 
 from core.config import get_settings
 
@@ -15,11 +22,35 @@ class Base(DeclarativeBase):
     pass
 
 
+def _json_serializer(obj) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _engine_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        # aiosqlite gains nothing from pooling; in-memory DBs must share one connection
+        in_memory = ":memory:" in url or url.rstrip("/").endswith("sqlite+aiosqlite:")
+        return {
+            # SQLite-specific: allow concurrent access from multiple async tasks
+            "connect_args": {"check_same_thread": False},
+            "poolclass": StaticPool if in_memory else NullPool,
+        }
+    return {
+        "pool_size":     settings.DB_POOL_SIZE,
+        "max_overflow":  settings.DB_MAX_OVERFLOW,
+        "pool_timeout":  settings.DB_POOL_TIMEOUT,
+        "pool_recycle":  settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.APP_ENV == "development",
-    # SQLite-specific: allow concurrent access from multiple async tasks
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    # JSON/JSONB columns are encoded and parsed with orjson
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_engine_kwargs(settings.DATABASE_URL),
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -31,6 +62,13 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+def dialect_insert(model):
+    """INSERT construct for the configured backend, supporting ON CONFLICT upserts."""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 async def create_tables():
     """Create all tables. Called on startup if running without Alembic."""
     from models.db_models import Base as ModelsBase  # noqa: F401 (trigger import)
@@ -7,24 +7,35 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from starlette.formparsers import MultiPartParser
 
+from core.cache import init_cache
 from core.config import get_settings
 from db.session import create_tables
-from services.inference import load_champion_model
+from services.batching import batcher
+from services.inference import load_champion_model, shutdown_inference_pool, start_inference_pool
 
 settings = get_settings()
 
+# Spool threshold for UploadFile (Starlette's default is 1 MB)
+MultiPartParser.max_file_size = settings.UPLOAD_SPOOL_MAX_BYTES
+
 
 # ── Lifespan ───────────────────────────────────────────────────────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: create DB tables + load ML model. Shutdown: nothing to clean."""
+    """Startup: create DB tables + init cache + load ML model, registry and inference pool. Shutdown: stop batcher + pool."""
     print("🚀 Starting up...")
     await create_tables()
-    load_champion_model()
+    init_cache()
+    load_champion_model()  # also parses + caches the registry for /model/metrics
+    start_inference_pool()
+    batcher.start()
     yield
     print("👋 Shutting down...")
+    await batcher.stop()
+    shutdown_inference_pool()
 
 
 # ── App factory ────────────────────────────────────────────────────────────────
@@ -35,6 +46,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ── CORS ───────────────────────────────────────────────────────────────────────
@@ -60,7 +72,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     import traceback
     traceback.print_exc()
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "INTERNAL_SERVER_ERROR",
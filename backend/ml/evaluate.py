@@ -3,13 +3,18 @@ Standalone model evaluation utilities.
 Used by train.py and surfaced via the /model/metrics API endpoint.
 """
 
-import json
 import os
+from functools import lru_cache
+from typing import Optional
+
 import numpy as np
+import orjson
 from sklearn.metrics import (
-    accuracy_score, f1_score, precision_score,
-    recall_score, roc_auc_score, confusion_matrix
+    precision_recall_fscore_support, roc_auc_score, confusion_matrix
 )
+from sklearn.utils.multiclass import unique_labels
+
+LABELS = [0, 1, 2]  # High, Medium, At Risk
 
 MODEL_REGISTRY_PATH = os.environ.get(
     "MODEL_REGISTRY_PATH", "./ml/models/model_registry.json"
@@ -21,17 +26,21 @@ def compute_metrics(y_true, y_pred, y_proba=None) -> dict:
     Compute full classification metrics.
     Returns a dict compatible with ModelMetricsResponse schema.
     """
-    acc        = accuracy_score(y_true, y_pred)
-    f1_ar      = f1_score(y_true, y_pred, labels=[2], average="macro", zero_division=0)
-    f1_macro   = f1_score(y_true, y_pred, average="macro", zero_division=0)
-    prec_ar    = precision_score(y_true, y_pred, labels=[2], average="macro", zero_division=0)
-    rec_ar     = recall_score(y_true, y_pred, labels=[2], average="macro", zero_division=0)
-    cm         = confusion_matrix(y_true, y_pred).tolist()
+    # One pass for per-class P/R/F1, one for the confusion matrix (accuracy = its trace)
+    prec, rec, f1, _ = precision_recall_fscore_support(y_true, y_pred, labels=LABELS, zero_division=0)
+    # Macro F1 and the confusion matrix span the labels present in y_true/y_pred,
+    # as f1_score(average="macro") and confusion_matrix() do without labels=
+    present    = unique_labels(y_true, y_pred)
+    cm_arr     = confusion_matrix(y_true, y_pred, labels=present)
+    acc        = float(np.trace(cm_arr) / max(cm_arr.sum(), 1))
+    f1_ar, prec_ar, rec_ar = float(f1[2]), float(prec[2]), float(rec[2])
+    f1_macro   = float(f1[np.isin(LABELS, present)].mean())
+    cm         = cm_arr.tolist()
 
     roc = 0.0
     if y_proba is not None:
         try:
-            roc = roc_auc_score(y_true, y_proba, multi_class="ovr", average="macro")
+            roc = float(roc_auc_score(y_true, y_proba, multi_class="ovr", average="macro"))
         except Exception:
             pass
 
@@ -46,13 +55,29 @@ def compute_metrics(y_true, y_pred, y_proba=None) -> dict:
     }
 
 
-def load_registry() -> dict:
-    """Load and return the model registry JSON."""
-    path = os.environ.get("MODEL_REGISTRY_PATH", MODEL_REGISTRY_PATH)
-    if not os.path.exists(path):
+@lru_cache(maxsize=1)
+def _read_registry(path: str, mtime: float) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def load_registry(path: Optional[str] = None) -> dict:
+    """
+    Load and return the model registry JSON.
+    Parsed once and reused until the file's mtime changes (i.e. after retraining).
+    """
+    path = path or os.environ.get("MODEL_REGISTRY_PATH", MODEL_REGISTRY_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
         return {}
-    with open(path, "r") as f:
-        return json.load(f)
+    return _read_registry(path, mtime)
+
+
+def reload_registry() -> dict:
+    """Drop the cached registry and read it again from disk."""
+    _read_registry.cache_clear()
+    return load_registry()
 
 
 def detect_drift(metrics: dict) -> bool:
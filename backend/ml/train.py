@@ -10,8 +10,9 @@ Run from backend/ directory:
 
 import os
 import sys
-import json
 import joblib
+import orjson
+from joblib import Parallel, delayed
 import warnings
 import numpy as np
 import pandas as pd
@@ -20,15 +21,19 @@ from datetime import datetime
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, StratifiedKFold
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import (
-    accuracy_score, f1_score, precision_score,
-    recall_score, roc_auc_score, confusion_matrix
+    precision_recall_fscore_support, roc_auc_score, confusion_matrix
 )
 
 import xgboost as xgb
 import lightgbm as lgb
 
+try:
+    import psutil
+except ImportError:  # listed in requirements.txt; without it, see _physical_cores
+    psutil = None
+
 warnings.filterwarnings("ignore")
 
 # ── Paths ──────────────────────────────────────────────────────────────────────
@@ -45,6 +50,32 @@ CATEGORICAL_FEATURES = ["gender", "department"]
 DROP_COLS            = ["student_id", "performance_category"]
 LABEL_MAP            = {"High": 0, "Medium": 1, "At Risk": 2}
 LABEL_MAP_INV        = {v: k for k, v in LABEL_MAP.items()}
+LABELS               = list(LABEL_MAP.values())
+
+# Set TRAIN_DEVICE=cuda to train the boosted models on a GPU
+TRAIN_DEVICE = os.environ.get("TRAIN_DEVICE", "cpu").lower()
+USE_GPU      = TRAIN_DEVICE == "cuda"
+
+
+def _physical_cores() -> int:
+    """
+    Thread count for the tree learners. OMP_NUM_THREADS overrides; otherwise
+    physical cores, since SMT siblings only add contention in histogram building.
+    """
+    env = os.environ.get("OMP_NUM_THREADS")
+    if env and env.isdigit() and int(env) > 0:
+        return int(env)
+    cores = psutil.cpu_count(logical=False) if psutil else None
+    if not cores:
+        print("⚠️  psutil unavailable — using logical CPU count; set OMP_NUM_THREADS "
+              "to the physical core count to avoid oversubscription")
+    return cores or os.cpu_count() or 1
+
+
+N_PHYS = _physical_cores()
+
+# Below this many training rows the models fit in seconds — process startup would dominate
+PARALLEL_MIN_ROWS = 5000
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 
@@ -54,24 +85,28 @@ def load_and_preprocess(path: str):
     df = pd.read_csv(path)
     print(f"📂 Loaded {len(df)} records from {path}")
 
-    # Encode categoricals
+    # Encode categoricals — sorted categories give the same codes LabelEncoder did
     label_encoders = {}
     for col in CATEGORICAL_FEATURES:
-        le = LabelEncoder()
-        df[col] = le.fit_transform(df[col].astype(str))
-        label_encoders[col] = le
+        cat = pd.Categorical(df[col].astype(str))
+        df[col] = cat.codes.astype(np.int16)
+        label_encoders[col] = cat.categories.tolist()
 
     # Encode boolean
     df["financial_aid"] = df["financial_aid"].astype(int)
 
     # Target label
-    y = df[LABEL_COL].map(LABEL_MAP).values
-    X = df.drop(columns=DROP_COLS).values
+    y = pd.Categorical(df[LABEL_COL], categories=list(LABEL_MAP.keys())).codes.astype(np.int8)
+    X = df.drop(columns=DROP_COLS).to_numpy(dtype=np.float32)
     feature_names = [c for c in df.columns if c not in DROP_COLS]
 
-    # Scale
+    # Scale (float32 in → float32 out)
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
+    # sklearn keeps the fitted statistics in float64; stored as float32 so the
+    # API's transform never upcasts and needs no cast on load
+    for attr in ("mean_", "var_", "scale_"):
+        setattr(scaler, attr, getattr(scaler, attr).astype(np.float32))
 
     return X_scaled, y, scaler, label_encoders, feature_names
 
@@ -81,12 +116,13 @@ def evaluate_model(model, X_test, y_test, model_name: str):
     y_pred  = model.predict(X_test)
     y_proba = model.predict_proba(X_test)
 
-    acc      = accuracy_score(y_test, y_pred)
-    f1_ar    = f1_score(y_test, y_pred, labels=[2], average="macro")
-    prec_ar  = precision_score(y_test, y_pred, labels=[2], average="macro", zero_division=0)
-    rec_ar   = recall_score(y_test, y_pred, labels=[2], average="macro", zero_division=0)
-    f1_macro = f1_score(y_test, y_pred, average="macro")
-    cm       = confusion_matrix(y_test, y_pred).tolist()
+    # One pass for per-class P/R/F1, one for the confusion matrix (accuracy = its trace)
+    prec, rec, f1, _ = precision_recall_fscore_support(y_test, y_pred, labels=LABELS, zero_division=0)
+    cm_arr   = confusion_matrix(y_test, y_pred, labels=LABELS)
+    acc      = float(np.trace(cm_arr) / cm_arr.sum())
+    f1_ar, prec_ar, rec_ar = float(f1[2]), float(prec[2]), float(rec[2])
+    f1_macro = float(f1.mean())
+    cm       = cm_arr.tolist()
 
     try:
         roc = roc_auc_score(y_test, y_proba, multi_class="ovr", average="macro")
@@ -113,6 +149,43 @@ def evaluate_model(model, X_test, y_test, model_name: str):
     return metrics
 
 
+# ── Compilation ────────────────────────────────────────────────────────────────
+def compile_champion(model, libpath: str) -> bool:
+    """
+    Compile a tree-ensemble champion to a native shared library with
+    Treelite + TL2cgen. Optional: returns False when the packages or a C
+    toolchain are unavailable, or the model is not a tree ensemble.
+    """
+    try:
+        import treelite
+        import tl2cgen
+    except ImportError:
+        return False
+
+    try:
+        if isinstance(model, xgb.XGBClassifier):
+            booster = model.get_booster()
+            if getattr(model, "best_iteration", None) is not None:
+                booster = booster[: model.best_iteration + 1]  # trees kept by early stopping
+            tl_model = treelite.frontend.from_xgboost(booster)
+        elif isinstance(model, lgb.LGBMClassifier):
+            tl_model = treelite.frontend.from_lightgbm(model.booster_)
+        elif isinstance(model, RandomForestClassifier):
+            tl_model = treelite.sklearn.import_model(model)
+        else:
+            return False
+        tl2cgen.export_lib(tl_model, toolchain="gcc", libpath=libpath, params={"parallel_comp": 32})
+    except Exception as e:
+        print(f"⚠️  Champion compilation skipped: {e}")
+        return False
+    return True
+
+
+def _fit_and_score(name, clf, X_fit, y_fit, fit_kwargs, X_test, y_test):
+    clf.fit(X_fit, y_fit, **fit_kwargs)
+    return name, clf, evaluate_model(clf, X_test, y_test, name)
+
+
 # ── Training ───────────────────────────────────────────────────────────────────
 def train():
     print("\n🚀 Starting ML Training Pipeline\n" + "="*50)
@@ -121,20 +194,29 @@ def train():
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.20, stratify=y, random_state=42
     )
-    print(f"  Train: {len(X_train)} | Test: {len(X_test)}")
+    # Held-out slice of the training set for early stopping of the boosted models
+    X_tr, X_val, y_tr, y_val = train_test_split(
+        X_train, y_train, test_size=0.15, stratify=y_train, random_state=42
+    )
+    print(f"  Train: {len(X_train)} | Test: {len(X_test)} | Early-stop val: {len(X_val)}")
     print(f"  Class dist (train): {np.bincount(y_train.astype(int))}")
 
     models = {
         "LogisticRegression": LogisticRegression(max_iter=1000, random_state=42),
-        "RandomForest":       RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1),
+        "RandomForest":       RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=N_PHYS),
         "XGBoost":            xgb.XGBClassifier(
                                   n_estimators=200, learning_rate=0.1,
                                   max_depth=6, use_label_encoder=False,
-                                  eval_metric="mlogloss", random_state=42, verbosity=0
+                                  tree_method="hist", max_bin=64, grow_policy="lossguide",
+                                  device="cuda" if USE_GPU else "cpu", n_jobs=N_PHYS,
+                                  eval_metric="mlogloss", early_stopping_rounds=20,
+                                  random_state=42, verbosity=0
                               ),
         "LightGBM":           lgb.LGBMClassifier(
                                   n_estimators=200, learning_rate=0.1,
-                                  max_depth=6, random_state=42, verbose=-1
+                                  max_depth=6, max_bin=63, num_leaves=31, min_child_samples=20,
+                                  device="gpu" if USE_GPU else "cpu", n_jobs=N_PHYS,
+                                  random_state=42, verbose=-1
                               ),
     }
 
@@ -142,9 +224,30 @@ def train():
     all_metrics  = []
     trained_models = {}
 
-    for name, clf in models.items():
-        clf.fit(X_train, y_train)
-        m = evaluate_model(clf, X_test, y_test, name)
+    # Boosters stop adding trees once the validation loss stops improving
+    fit_args = {
+        "XGBoost":  {"eval_set": [(X_val, y_val)], "verbose": False},
+        "LightGBM": {"eval_set": [(X_val, y_val)], "callbacks": [lgb.early_stopping(20, verbose=False)]},
+    }
+
+    jobs = [
+        (name, clf, X_tr, y_tr, fit_args[name], X_test, y_test) if name in fit_args
+        else (name, clf, X_train, y_train, {}, X_test, y_test)
+        for name, clf in models.items()
+    ]
+
+    if len(X_train) >= PARALLEL_MIN_ROWS:
+        # One process per model; split the physical cores between them
+        per_model = max(1, N_PHYS // len(models))
+        for clf in models.values():
+            clf.set_params(n_jobs=per_model)
+        results = Parallel(n_jobs=len(models), backend="loky")(
+            delayed(_fit_and_score)(*job) for job in jobs
+        )
+    else:
+        results = [_fit_and_score(*job) for job in jobs]
+
+    for name, clf, m in results:
         all_metrics.append(m)
         trained_models[name] = clf
 
@@ -154,15 +257,32 @@ def train():
     print(f"\n🏆 Champion Model: {best['model_name']} (F1 At-Risk={best['f1_at_risk']:.4f})")
 
     # ── Save artifacts ─────────────────────────────────────────────────────────
-    joblib.dump(best_model,  os.path.join(MODEL_DIR, "champion_model.pkl"))
+    # Compressed pickles for smaller images / faster cold reads. The scaler stays
+    # uncompressed: the API memory-maps its float32 arrays without copying them,
+    # and mmap can't read compressed files.
+    joblib.dump(best_model,  os.path.join(MODEL_DIR, "champion_model.pkl"), compress=3)
     joblib.dump(scaler,      os.path.join(MODEL_DIR, "scaler.pkl"))
-    joblib.dump(label_encoders, os.path.join(MODEL_DIR, "label_encoders.pkl"))
-    joblib.dump(feature_names,  os.path.join(MODEL_DIR, "feature_names.pkl"))
+    joblib.dump(label_encoders, os.path.join(MODEL_DIR, "label_encoders.pkl"), compress=3)
+    joblib.dump(feature_names,  os.path.join(MODEL_DIR, "feature_names.pkl"), compress=3)
+
+    # Boosted champions are also saved natively; the API prefers these over the pickle
+    native_model = None
+    if isinstance(best_model, xgb.XGBClassifier):
+        native_model = "champion_model.json"
+        best_model.save_model(os.path.join(MODEL_DIR, native_model))
+    elif isinstance(best_model, lgb.LGBMClassifier):
+        native_model = "champion_model.txt"
+        best_model.booster_.save_model(os.path.join(MODEL_DIR, native_model))
+
+    # Compiled predict_proba for the API, when Treelite is installed
+    compiled_model = "champion.so"
+    if not compile_champion(best_model, os.path.join(MODEL_DIR, compiled_model)):
+        compiled_model = None
 
     # Also save all models for reference
     for name, clf in trained_models.items():
         safe_name = name.lower().replace(" ", "_")
-        joblib.dump(clf, os.path.join(MODEL_DIR, f"{safe_name}.pkl"))
+        joblib.dump(clf, os.path.join(MODEL_DIR, f"{safe_name}.pkl"), compress=3)
 
     # ── Write registry ─────────────────────────────────────────────────────────
     registry = {
@@ -172,12 +292,14 @@ def train():
             "is_champion":   True,
             "trained_at":    datetime.utcnow().isoformat() + "Z",
             "feature_names": feature_names,
+            "native_model":  native_model,
+            "compiled_model": compiled_model,
             "label_map":     LABEL_MAP_INV,
         },
         "all_models": all_metrics,
     }
-    with open(REGISTRY, "w") as f:
-        json.dump(registry, f, indent=2)
+    with open(REGISTRY, "wb") as f:
+        f.write(orjson.dumps(registry, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
 
     print(f"\n✅ Artifacts saved to {MODEL_DIR}")
     print(f"✅ Registry written to {REGISTRY}")
@@ -7,13 +7,18 @@ from datetime import datetime, timezone
 
 from sqlalchemy import (
     JSON, Boolean, Column, DateTime, Float,
-    ForeignKey, Integer, String, Text
+    ForeignKey, Index, Integer, String, Text
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from db.session import Base
 
 
+# Binary JSONB on PostgreSQL, plain JSON elsewhere (SQLite)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+
 def _uuid():
     return str(uuid.uuid4())
 
@@ -35,8 +40,9 @@ class User(Base):
     created_at    = Column(DateTime(timezone=True), default=_now)
     updated_at    = Column(DateTime(timezone=True), default=_now, onupdate=_now)
 
-    audit_logs    = relationship("AuditLog", back_populates="user", lazy="select")
-    upload_batches = relationship("UploadBatch", back_populates="uploaded_by_user", lazy="select")
+    # Relationships never load implicitly — query explicitly or use selectinload()
+    audit_logs    = relationship("AuditLog", back_populates="user", lazy="raise_on_sql")
+    upload_batches = relationship("UploadBatch", back_populates="uploaded_by_user", lazy="raise_on_sql")
 
 
 # ── Students ───────────────────────────────────────────────────────────────────
@@ -52,7 +58,7 @@ class Student(Base):
     created_at = Column(DateTime(timezone=True), default=_now)
     updated_at = Column(DateTime(timezone=True), default=_now, onupdate=_now)
 
-    predictions = relationship("Prediction", back_populates="student", lazy="select",
+    predictions = relationship("Prediction", back_populates="student", lazy="raise_on_sql",
                                order_by="Prediction.predicted_at.desc()")
 
 
@@ -61,8 +67,9 @@ class Prediction(Base):
     __tablename__ = "predictions"
 
     id                       = Column(String(36), primary_key=True, default=_uuid)
+    # student_id / performance_category lead the composite indexes below, so need no index of their own
     student_id               = Column(String(50), ForeignKey("students.student_id", ondelete="CASCADE"),
-                                      nullable=False, index=True)
+                                      nullable=False)
 
     # Raw feature snapshot
     attendance_pct           = Column(Float)
@@ -76,19 +83,29 @@ class Prediction(Base):
     financial_aid            = Column(Boolean)
 
     # Prediction outputs
-    performance_category     = Column(String(20), nullable=False, index=True)
+    performance_category     = Column(String(20), nullable=False)
     dropout_probability      = Column(Float, nullable=False)
     confidence_score         = Column(Float)
-    top_factors              = Column(JSON)   # list[{feature, impact, value}]
-    recommended_interventions = Column(JSON)  # list[str]
+    top_factors              = Column(JSONVariant)   # list[{feature, impact, value}]
+    recommended_interventions = Column(JSONVariant)  # list[str]
     data_quality_flag        = Column(String(30))  # None | "INSUFFICIENT_DATA"
 
     # Metadata
     model_version            = Column(String(50))
     batch_upload_id          = Column(String(36), index=True)
+    # Own index: predicted_at is never the leading column of a composite, and
+    # recency/drift scans filter or order by it alone
     predicted_at             = Column(DateTime(timezone=True), default=_now, index=True)
 
-    student = relationship("Student", back_populates="predictions")
+    student = relationship("Student", back_populates="predictions", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Latest-prediction-per-student lookups (window in GET /students) and the
+        # per-student history query: index-order scan, no sort node
+        Index("ix_pred_student_time", student_id, predicted_at.desc(), postgresql_using="btree"),
+        # "All predictions in category X over a date range" (dashboards, reports)
+        Index("ix_pred_cat_time", performance_category, predicted_at.desc(), postgresql_using="btree"),
+    )
 
 
 # ── Audit Logs ─────────────────────────────────────────────────────────────────
@@ -103,7 +120,7 @@ class AuditLog(Base):
     ip_address = Column(String(45))
     created_at = Column(DateTime(timezone=True), default=_now)
 
-    user = relationship("User", back_populates="audit_logs")
+    user = relationship("User", back_populates="audit_logs", lazy="raise_on_sql")
 
 
 # ── Upload Batches ─────────────────────────────────────────────────────────────
@@ -121,7 +138,7 @@ class UploadBatch(Base):
     created_at     = Column(DateTime(timezone=True), default=_now)
     completed_at   = Column(DateTime(timezone=True))
 
-    uploaded_by_user = relationship("User", back_populates="upload_batches")
+    uploaded_by_user = relationship("User", back_populates="upload_batches", lazy="raise_on_sql")
 
 
 # ── Model Registry ─────────────────────────────────────────────────────────────
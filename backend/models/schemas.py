@@ -4,7 +4,7 @@ Pydantic v2 schemas: all request/response models for every API endpoint.
 
 from datetime import datetime
 from typing import Any, Optional
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 
 
 # ── Auth ──────────────────────────────────────────────────────────────────────
@@ -53,6 +53,10 @@ class TopFactor(BaseModel):
     value: float
 
 
+# Validates a stored top_factors list in one pydantic-core pass
+TOP_FACTORS_ADAPTER = TypeAdapter(list[TopFactor])
+
+
 class PredictionResponse(BaseModel):
     student_id: str
     performance_category: str
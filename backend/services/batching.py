@@ -0,0 +1,89 @@
+"""
+Dynamic request batching for single-student predictions.
+Concurrent POST /predict calls are collected for up to PREDICT_BATCH_TIMEOUT_MS
+(or PREDICT_BATCH_MAX requests) and scored with one vectorized model call.
+"""
+
+import asyncio
+from typing import Optional
+
+import numpy as np
+
+from core.config import get_settings
+from services.inference import predict_batch_vectorized, predict_single, run_inference
+
+settings = get_settings()
+
+
+class PredictionBatcher:
+    def __init__(self, max_batch: int, timeout_ms: float):
+        self.max_batch = max_batch
+        self.timeout   = timeout_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def start(self):
+        """Start the background collector. Called once at application startup."""
+        self._queue = asyncio.Queue()
+        self._task  = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._queue = None
+        self._task  = None
+
+    async def submit(self, X: np.ndarray, raw_record: dict) -> dict:
+        """Queue one preprocessed (1, n_features) vector; resolves to its prediction dict."""
+        if self._queue is None:
+            # Batcher not running (e.g. app used without lifespan) → score directly
+            return await run_inference(predict_single, X, raw_record)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, raw_record, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.timeout
+            while len(items) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Score in the background so the next batch can fill meanwhile
+            task = asyncio.create_task(self._dispatch(items))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, items: list[tuple]):
+        X       = np.vstack([x for x, _, _ in items])
+        records = [r for _, r, _ in items]
+        try:
+            # Coalesced single requests keep full explanations, like predict_single
+            preds = await run_inference(predict_batch_vectorized, X, records, True)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), pred in zip(items, preds):
+            if not future.done():
+                future.set_result(pred)
+
+
+batcher = PredictionBatcher(
+    max_batch=settings.PREDICT_BATCH_MAX,
+    timeout_ms=settings.PREDICT_BATCH_TIMEOUT_MS,
+)
@@ -1,17 +1,25 @@
 """
 Inference service: loads champion model at startup (singleton),
 runs predict_proba, computes SHAP values, returns structured predictions.
+CPU-bound inference is dispatched to a process pool so it never runs on
+the event loop.
 """
 
-import json
+import asyncio
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 import joblib
 import numpy as np
 import shap
+from cachetools import LRUCache
 
 from core.config import get_settings
-from models.schemas import PredictionResponse, TopFactor
+from ml.evaluate import load_registry
+from services.preprocessing import FEATURE_DTYPE
+from models.schemas import PredictionResponse
 
 settings = get_settings()
 
@@ -23,6 +31,58 @@ _model = None
 _explainer = None
 _model_version = "v1.0"
 _feature_names: list[str] = []
+_inference_pool: Optional[ProcessPoolExecutor] = None
+
+# Per-process SHAP cache for served predictions, keyed on the input rounded to 2 decimals
+SHAP_CACHE_SIZE = 4096
+_shap_cache: LRUCache = LRUCache(maxsize=SHAP_CACHE_SIZE)
+_shap_cache_lock = threading.Lock()
+
+
+class _BoosterClassifier:
+    """predict_proba shim over a native LightGBM Booster (multiclass → (N, C) probabilities)."""
+
+    def __init__(self, booster):
+        self.booster = booster
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.booster.predict(X)
+
+
+class _CompiledClassifier:
+    """predict_proba shim over a TL2cgen-compiled champion (champion.so)."""
+
+    def __init__(self, predictor, dmatrix_cls):
+        self.predictor   = predictor
+        self.dmatrix_cls = dmatrix_cls
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        out = self.predictor.predict(self.dmatrix_cls(X))
+        return out.reshape(len(X), -1)  # (N, 1, C) → (N, C)
+
+
+def _load_compiled_model(path: str):
+    """Load the compiled champion; None when tl2cgen is not installed."""
+    try:
+        import tl2cgen
+    except ImportError:
+        return None
+    return _CompiledClassifier(tl2cgen.Predictor(path), tl2cgen.DMatrix)
+
+
+def _load_native_model(path: str):
+    """
+    Load a champion saved in its library's native format: XGBoost JSON (.json)
+    or LightGBM text (.txt). Returns (model, explainer_target).
+    """
+    if path.endswith(".json"):
+        import xgboost as xgb
+        clf = xgb.XGBClassifier()
+        clf.load_model(path)
+        return clf, clf
+    import lightgbm as lgb
+    booster = lgb.Booster(model_file=path)
+    return _BoosterClassifier(booster), booster
 
 
 def load_champion_model():
@@ -34,20 +94,37 @@ def load_champion_model():
 
     registry_path = settings.MODEL_REGISTRY_PATH
     model_dir     = settings.MODEL_DIR
+    native_model  = None
+    compiled_model = None
 
-    if os.path.exists(registry_path):
-        with open(registry_path, "r") as f:
-            registry = json.load(f)
+    # orjson-parsed and cached — the /model routes reuse the same parse
+    registry = load_registry(registry_path)
+    if registry:
         champion = registry.get("champion", {})
         _model_version = champion.get("model_version", "v1.0")
         _feature_names = champion.get("feature_names", [])
+        native_model   = champion.get("native_model")
+        compiled_model = champion.get("compiled_model")
+
+    # Boosted champions also ship in native format — much faster to load than a pickle
+    native_path = os.path.join(model_dir, native_model) if native_model else None
+    model_path  = os.path.join(model_dir, "champion_model.pkl")
+    if native_path and os.path.exists(native_path):
+        _model, explain_target = _load_native_model(native_path)
+    elif os.path.exists(model_path):
+        _model = explain_target = joblib.load(model_path)
+
+    # Compiled champion serves predict_proba; SHAP still uses the library model
+    compiled_path = os.path.join(model_dir, compiled_model) if compiled_model else None
+    if _model is not None and compiled_path and os.path.exists(compiled_path):
+        compiled = _load_compiled_model(compiled_path)
+        if compiled is not None:
+            _model = compiled
 
-    model_path = os.path.join(model_dir, "champion_model.pkl")
-    if os.path.exists(model_path):
-        _model = joblib.load(model_path)
+    if _model is not None:
         # Build SHAP explainer once
         try:
-            _explainer = shap.TreeExplainer(_model)
+            _explainer = shap.TreeExplainer(explain_target)
         except Exception:
             _explainer = None
         print(f"✅ Champion model loaded: {_model_version}")
@@ -55,6 +132,42 @@ def load_champion_model():
         print("⚠️  No trained model found. Run ml/train.py first.")
 
 
+def start_inference_pool():
+    """
+    Start the inference worker pool. Each worker loads the champion model once
+    via the pool initializer. Called once at application startup.
+    """
+    global _inference_pool
+
+    workers = settings.INFERENCE_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0 or _model is None:
+        return  # run_inference falls back to the default thread pool
+    _inference_pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=load_champion_model,
+    )
+    print(f"✅ Inference pool started: {workers} workers")
+
+
+def shutdown_inference_pool():
+    global _inference_pool
+    if _inference_pool is not None:
+        _inference_pool.shutdown(wait=False, cancel_futures=True)
+        _inference_pool = None
+
+
+async def run_inference(fn, *args):
+    """
+    Run a blocking inference function (predict_single / predict_batch_vectorized)
+    in the worker pool, or in the default thread pool when the pool is disabled.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_inference_pool, fn, *args)
+
+
 def get_model():
     return _model
 
@@ -72,10 +185,10 @@ def _get_impact_label(abs_val: float, total: float) -> str:
     return "LOW"
 
 
-def get_top_shap_factors(shap_values: np.ndarray, raw_record: dict, n: int = 3) -> list[TopFactor]:
+def get_top_shap_factors(shap_values: np.ndarray, raw_record: dict, n: int = 3) -> list[dict]:
     """
     Compute top-n SHAP factors for the predicted class.
-    Returns list of TopFactor dicts.
+    Returns plain dicts in TopFactor shape — trusted output, no per-factor validation.
     """
     names = _feature_names if _feature_names else list(raw_record.keys())
     abs_vals = np.abs(shap_values)
@@ -91,14 +204,61 @@ def get_top_shap_factors(shap_values: np.ndarray, raw_record: dict, n: int = 3)
         abs_v     = float(abs_vals[idx])
         raw_val   = raw_record.get(feat_name, 0.0)
         impact    = _get_impact_label(abs_v, total)
-        factors.append(TopFactor(
-            feature=feat_name,
-            impact=impact,
-            value=float(raw_val) if isinstance(raw_val, (int, float, np.floating)) else 0.0,
-        ))
+        factors.append({
+            "feature": feat_name,
+            "impact":  impact,
+            "value":   float(raw_val) if isinstance(raw_val, (int, float, np.floating)) else 0.0,
+        })
     return factors
 
 
+def _class_shap(sv, row: int, class_idx: int) -> np.ndarray:
+    """Select one row's SHAP vector for the given class from any shap_values layout."""
+    # sv may be list (one (N, F) array per class), (N, F, C) ndarray or (N, F) ndarray
+    if isinstance(sv, list):
+        return sv[class_idx][row]
+    if sv.ndim == 3:
+        return sv[row, :, class_idx]
+    return sv[row]
+
+
+def _rows_shap(sv, n_rows: int) -> list[np.ndarray]:
+    """Split shap_values output into one (n_classes, F) array per row."""
+    classes = range(len(LABEL_MAP_INV))
+    return [np.stack([_class_shap(sv, row, c) for c in classes]) for row in range(n_rows)]
+
+
+def _cached_shap_rows(explainer, X: np.ndarray) -> list[np.ndarray]:
+    """
+    Per-row SHAP values for X, served from the LRU where possible.
+    Misses are explained together in one shap_values call.
+    """
+    keys = [tuple(np.round(x, 2).tolist()) for x in X]
+    with _shap_cache_lock:
+        out = [_shap_cache.get(k) for k in keys]
+    missing = [i for i, v in enumerate(out) if v is None]
+    if missing:
+        computed = _rows_shap(explainer.shap_values(X[missing]), len(missing))
+        with _shap_cache_lock:
+            for i, row_sv in zip(missing, computed):
+                out[i] = _shap_cache[keys[i]] = row_sv
+    return out
+
+
+def _format_prediction(proba: np.ndarray, top_factors: list[dict]) -> dict:
+    """Build the prediction dict for one row of predict_proba output."""
+    pred_idx     = int(np.argmax(proba))
+    dropout_prob = float(proba[2])  # index 2 = "At Risk" probability
+    confidence   = float(proba[pred_idx])
+    return {
+        "performance_category": LABEL_MAP_INV[pred_idx],
+        "dropout_probability":  round(dropout_prob, 4),
+        "confidence":           round(confidence, 4),
+        "top_factors":          top_factors,
+        "model_version":        _model_version,
+    }
+
+
 def predict_single(X: np.ndarray, raw_record: dict) -> dict:
     """
     Run inference on a single preprocessed feature vector.
@@ -110,30 +270,63 @@ def predict_single(X: np.ndarray, raw_record: dict) -> dict:
     if model is None:
         raise RuntimeError("Model not loaded. Run ml/train.py first.")
 
+    X        = np.ascontiguousarray(X, dtype=FEATURE_DTYPE)
     proba    = model.predict_proba(X)[0]  # shape: (3,)
     pred_idx = int(np.argmax(proba))
-    category = LABEL_MAP_INV[pred_idx]
-    dropout_prob = float(proba[2])  # index 2 = "At Risk" probability
-    confidence   = float(proba[pred_idx])
 
     # SHAP
     top_factors = []
     if explainer is not None:
         try:
-            sv = explainer.shap_values(X)
-            # sv may be list (one per class) or ndarray
-            if isinstance(sv, list):
-                class_shap = sv[pred_idx][0]
+            row_sv = _cached_shap_rows(explainer, X)[0]
+            top_factors = get_top_shap_factors(row_sv[pred_idx], raw_record)
+        except Exception as e:
+            print(f"SHAP warning: {e}")
+
+    return _format_prediction(proba, top_factors)
+
+
+def predict_batch_vectorized(
+    X: np.ndarray,
+    raw_records: list[dict],
+    explain_all: bool = False,
+) -> list[dict]:
+    """
+    Run inference on a preprocessed (N, n_features) matrix with a single
+    predict_proba call and a single SHAP call for the whole batch.
+    SHAP is only computed for rows predicted "At Risk" unless `explain_all`
+    is set — top factors drive interventions, which only matter for those rows.
+    `explain_all` (served requests) also goes through the SHAP cache; bulk
+    uploads bypass it so they don't evict the hot dashboard students.
+    Returns one prediction dict per row, in the same format as predict_single.
+    """
+    model     = get_model()
+    explainer = get_explainer()
+
+    if model is None:
+        raise RuntimeError("Model not loaded. Run ml/train.py first.")
+
+    X        = np.ascontiguousarray(X, dtype=FEATURE_DTYPE)
+    proba    = model.predict_proba(X)  # shape: (N, 3)
+    pred_idx = np.argmax(proba, axis=1)
+
+    # SHAP — one call over the rows that need explaining
+    explain_rows = np.arange(len(X)) if explain_all else np.flatnonzero(pred_idx == 2)
+    row_svs: dict[int, np.ndarray] = {}
+    if explainer is not None and len(explain_rows):
+        try:
+            if explain_all:
+                explained = _cached_shap_rows(explainer, X)
             else:
-                class_shap = sv[pred_idx] if sv.ndim == 2 else sv[0]
-            top_factors = get_top_shap_factors(class_shap, raw_record)
+                explained = _rows_shap(explainer.shap_values(X[explain_rows]), len(explain_rows))
+            row_svs = dict(zip(explain_rows.tolist(), explained))
         except Exception as e:
             print(f"SHAP warning: {e}")
 
-    return {
-        "performance_category": category,
-        "dropout_probability":  round(dropout_prob, 4),
-        "confidence":           round(confidence, 4),
-        "top_factors":          [f.model_dump() for f in top_factors],
-        "model_version":        _model_version,
-    }
+    results = []
+    for i, raw_record in enumerate(raw_records):
+        top_factors = []
+        if i in row_svs:
+            top_factors = get_top_shap_factors(row_svs[i][pred_idx[i]], raw_record)
+        results.append(_format_prediction(proba[i], top_factors))
+    return results
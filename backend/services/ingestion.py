@@ -2,24 +2,81 @@
 CSV ingestion service: parse, validate schema, deduplicate, batch predict, persist.
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
-from io import StringIO
-from typing import Any
+from typing import Any, BinaryIO
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from models.db_models import Student, Prediction, UploadBatch
 from models.schemas import BatchError
-from services.preprocessing import check_missing_ratio, preprocess_record, REQUIRED_FIELDS
-from services.inference import predict_single
-from services.intervention import get_interventions
+from services.preprocessing import (
+    REQUIRED_FIELDS,
+    invalid_numeric_rows,
+    missing_ratios,
+    preprocess_dataframe,
+)
+from services.inference import predict_batch_vectorized, run_inference
+from services.intervention import get_interventions_batch
+from services.persistence import insert_predictions, prediction_values, upsert_students
 
 REQUIRED_CSV_COLUMNS = [f for f in REQUIRED_FIELDS if f != "student_id"] + ["student_id"]
 OPTIONAL_OUTPUT_COLS = {"performance_category"}  # may appear in uploaded CSV from training data
 
+# Column types handed to the Arrow parser, so no column falls back to object dtype.
+# Scores stay float64: they are persisted as parsed, and float32 would store 80.1 as 80.0999…
+_DTYPES = {
+    "student_id":           pa.string(),
+    "age":                  pa.int16(),
+    "gender":               pa.string(),
+    "department":           pa.string(),
+    "semester":             pa.int8(),
+    "attendance_pct":       pa.float64(),
+    "assignment_score_avg": pa.float64(),
+    "internal_marks_avg":   pa.float64(),
+    "semester_gpa":         pa.float64(),
+    "study_hours_per_week": pa.float64(),
+    "participation_score":  pa.float64(),
+    "prev_semester_gpa":    pa.float64(),
+    "backlogs":             pa.int16(),
+    "financial_aid":        pa.bool_(),
+}
+
+
+def parse_csv(source: BinaryIO) -> pd.DataFrame:
+    """
+    Parse CSV from a binary file object with Arrow's multithreaded reader.
+    Arrow pulls blocks from the file as it parses, so the raw upload is
+    never held in memory as one bytes object.
+    Columns are parsed straight to their _DTYPES and stay Arrow-backed in
+    pandas (pd.ArrowDtype), so there is no numpy conversion copy.
+    A file with malformed cells is re-read with inferred types into regular
+    numpy/object columns, so process_batch can reject just those rows.
+    Blocking — call via asyncio.to_thread from async code.
+    """
+    read_options = pacsv.ReadOptions(use_threads=True)
+    try:
+        table = pacsv.read_csv(
+            source,
+            read_options=read_options,
+            # Empty cells → null for every column type, matching pd.read_csv
+            convert_options=pacsv.ConvertOptions(column_types=_DTYPES, strings_can_be_null=True),
+        )
+    except pa.ArrowInvalid:
+        source.seek(0)
+        table = pacsv.read_csv(
+            source,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+        )
+        return table.to_pandas()
+
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
 
 def validate_csv_schema(df: pd.DataFrame) -> list[BatchError]:
     """Check that all required columns are present and return list of errors."""
@@ -43,86 +100,89 @@ async def process_batch(
     db: AsyncSession,
 ) -> tuple[int, int, list[BatchError]]:
     """
-    For each row: preprocess → predict → get interventions → upsert student → insert prediction.
+    Missing-data check → preprocess → predict for the whole frame at once,
+    then interventions for all rows and bulk upsert/insert of students + predictions.
     Returns (processed_rows, error_rows, errors).
     """
-    processed = 0
-    error_count = 0
-    errors: list[BatchError] = []
-
-    for row_idx, row in df.iterrows():
-        record = row.to_dict()
-        student_id = str(record.get("student_id", "")).strip()
-
+    # Missing data check (vectorized over all rows), errors in one pass
+    ratios = missing_ratios(df)
+    skip = ratios > 0.30
+    skipped = df.loc[skip, "student_id"].astype(str).str.strip()
+    errors: list[BatchError] = [
+        BatchError(row=int(idx) + 2, error=f"Student {sid} has {ratio:.0%} missing fields — skipped")
+        for idx, sid, ratio in zip(skipped.index, skipped, ratios[skip])
+    ]
+    # Original index kept (no reset) so error rows still map to CSV lines
+    df = df.loc[~skip]
+
+    # Non-numeric values in numeric columns are rejected up front, so the
+    # column-wise pass below never has to fall back to per-row processing
+    bad = invalid_numeric_rows(df)
+    rejected = df.loc[bad, "student_id"].astype(str).str.strip()
+    errors.extend(
+        BatchError(row=int(idx) + 2, error=f"Student {sid} has non-numeric values in numeric fields — skipped")
+        for idx, sid in zip(rejected.index, rejected)
+    )
+    df = df.loc[~bad]
+    if df.empty:
+        return 0, len(errors), errors
+
+    # Raw tuples instead of iterrows() — no per-row Series construction
+    cols = df.columns.tolist()
+    rows = []
+    for row_idx, values in zip(df.index.tolist(), df.itertuples(index=False, name=None)):
+        # Arrow-backed columns yield plain Python scalars, with pd.NA for nulls
+        record = {c: (None if v is pd.NA else v) for c, v in zip(cols, values)}
+        record["student_id"] = str(record.get("student_id", "")).strip()
+        rows.append((row_idx, record))
+    records = [record for _, record in rows]
+
+    # Preprocess + predict the whole frame in one pass; Python loops only
+    # for DB row construction below
+    try:
+        X = await asyncio.to_thread(preprocess_dataframe, df)
+        preds = await run_inference(predict_batch_vectorized, X, records)
+    except Exception as e:
+        # e.g. model not loaded — every row fails the same way
+        errors.extend(BatchError(row=row_idx + 2, error=str(e)) for row_idx, _ in rows)
+        preds = [None] * len(rows)
+
+    # All intervention rules evaluated column-wise in one pass
+    interventions_all = get_interventions_batch(
+        df, np.array([p["dropout_probability"] if p else 0.0 for p in preds])
+    )
+
+    # One timestamp for the whole upload
+    now = datetime.now(timezone.utc)
+    student_rows: list[dict] = []
+    prediction_rows: list[dict] = []
+    for (row_idx, record), pred, interventions in zip(rows, preds, interventions_all):
+        if pred is None:
+            continue
         try:
-            # Missing data check
-            missing_ratio = check_missing_ratio(record)
-            if missing_ratio > 0.30:
-                errors.append(BatchError(
-                    row=int(row_idx) + 2,
-                    error=f"Student {student_id} has {missing_ratio:.0%} missing fields — skipped"
-                ))
-                error_count += 1
-                continue
-
-            # Preprocess
-            X = preprocess_record(record)
-
-            # Predict
-            pred = predict_single(X, record)
-
-            # Interventions
-            interventions = get_interventions(record, pred["dropout_probability"])
-
-            # Upsert Student
-            result = await db.execute(select(Student).where(Student.student_id == student_id))
-            student = result.scalar_one_or_none()
-            if student is None:
-                student = Student(
-                    student_id=student_id,
-                    age=record.get("age"),
-                    gender=str(record.get("gender", "")),
-                    department=str(record.get("department", "")),
-                    semester=record.get("semester"),
-                )
-                db.add(student)
-            else:
-                student.age        = record.get("age", student.age)
-                student.gender     = str(record.get("gender", student.gender))
-                student.department = str(record.get("department", student.department))
-                student.semester   = record.get("semester", student.semester)
-                student.updated_at = datetime.now(timezone.utc)
-
-            # Insert Prediction
-            prediction = Prediction(
-                student_id=student_id,
-                attendance_pct=record.get("attendance_pct"),
-                assignment_score_avg=record.get("assignment_score_avg"),
-                internal_marks_avg=record.get("internal_marks_avg"),
-                semester_gpa=record.get("semester_gpa"),
-                study_hours_per_week=record.get("study_hours_per_week"),
-                participation_score=record.get("participation_score"),
-                prev_semester_gpa=record.get("prev_semester_gpa"),
-                backlogs=record.get("backlogs"),
-                financial_aid=bool(record.get("financial_aid", False)),
-                performance_category=pred["performance_category"],
-                dropout_probability=pred["dropout_probability"],
-                confidence_score=pred["confidence"],
-                top_factors=pred["top_factors"],
-                recommended_interventions=interventions,
-                model_version=pred["model_version"],
-                batch_upload_id=batch_id,
-            )
-            db.add(prediction)
-
-            processed += 1
+            student_rows.append({
+                "student_id": record["student_id"],
+                "age":        record.get("age"),
+                "gender":     str(record.get("gender", "")),
+                "department": str(record.get("department", "")),
+                "semester":   record.get("semester"),
+                "created_at": now,
+                "updated_at": now,
+            })
+            prediction_rows.append(prediction_values(
+                record,
+                pred,
+                interventions,
+                predicted_at=now,
+                batch_id=batch_id,
+            ))
 
         except Exception as e:
             errors.append(BatchError(
-                row=int(row_idx) + 2,
+                row=row_idx + 2,
                 error=str(e)
             ))
-            error_count += 1
 
-    await db.flush()
-    return processed, error_count, errors
+    await upsert_students(db, student_rows, update_cols=("age", "gender", "department", "semester"))
+    await insert_predictions(db, prediction_rows)
+    return len(prediction_rows), len(errors), errors
@@ -4,11 +4,20 @@ Maps feature values and prediction outputs to actionable intervention strings.
 Ordered by severity — highest priority interventions appear first.
 """
 
+import numpy as np
+import pandas as pd
+
 from models.schemas import StudentInput
+from services.preprocessing import bool_column
+
+try:
+    from services.intervention_numba import compute_rule_mask
+except ImportError:  # numba is optional — NumPy masks are used instead
+    compute_rule_mask = None
 
 
 RULES = [
-    # (condition_fn, intervention_string)
+    # (condition_fn, intervention_string) — get_interventions_batch mirrors these
     (lambda s, p: p >= 0.70,           "Dropout Prevention Committee Review"),
     (lambda s, p: s.get("backlogs", 0) >= 3,      "Mandatory Counseling Session"),
     (lambda s, p: s.get("attendance_pct", 100) < 50,  "Attendance Warning Letter"),
@@ -20,6 +29,10 @@ RULES = [
 ]
 
 
+# Rule order for get_interventions_batch (same as RULES)
+BATCH_RULE_NAMES = tuple(recommendation for _, recommendation in RULES)
+
+
 def get_interventions(student_features: dict, dropout_probability: float) -> list[str]:
     """
     Given a student feature dict and predicted dropout probability,
@@ -33,3 +46,57 @@ def get_interventions(student_features: dict, dropout_probability: float) -> lis
         except Exception:
             pass
     return interventions if interventions else ["Regular Performance Monitoring"]
+
+
+def _column(df: pd.DataFrame, col: str, default) -> np.ndarray:
+    """Numeric column as float array; a missing column takes the same default as RULES."""
+    if col not in df.columns:
+        return np.full(len(df), float(default))
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _rule_mask_numpy(attendance, backlogs, gpa, study, part, assign, fin_aid, prob) -> np.ndarray:
+    """(N, 8) mask of fired rules, columns in BATCH_RULE_NAMES order."""
+    # NaN compares False, matching the per-record rules skipping missing values
+    with np.errstate(invalid="ignore"):
+        return np.column_stack([
+            prob >= 0.70,
+            backlogs >= 3,
+            attendance < 50,
+            gpa < 4.5,
+            study < 5,
+            part < 3,
+            assign < 40,
+            fin_aid & (prob >= 0.5),
+        ])
+
+
+def get_interventions_batch(records_df: pd.DataFrame, probs: np.ndarray) -> list[list[str]]:
+    """
+    Vectorized get_interventions for a whole frame of student records.
+    Rules are evaluated for every row at once (numba kernel when installed,
+    NumPy masks otherwise); strings are only built per row at the end.
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    if "financial_aid" in records_df.columns:
+        # Same coercion as preprocessing; missing or unparseable → False, never raises
+        financial_aid = bool_column(records_df["financial_aid"]).fillna(False).to_numpy(dtype=bool)
+    else:
+        financial_aid = np.zeros(len(records_df), dtype=bool)
+
+    kernel = compute_rule_mask if compute_rule_mask is not None else _rule_mask_numpy
+    mask = kernel(
+        _column(records_df, "attendance_pct", 100),
+        _column(records_df, "backlogs", 0),
+        _column(records_df, "semester_gpa", 10),
+        _column(records_df, "study_hours_per_week", 10),
+        _column(records_df, "participation_score", 10),
+        _column(records_df, "assignment_score_avg", 100),
+        financial_aid,
+        probs,
+    ).astype(bool, copy=False)
+
+    results = [["Regular Performance Monitoring"] for _ in range(len(records_df))]
+    for i in np.flatnonzero(mask.any(axis=1)):
+        results[i] = [BATCH_RULE_NAMES[j] for j in np.flatnonzero(mask[i])]
+    return results
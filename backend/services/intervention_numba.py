@@ -0,0 +1,28 @@
+"""
+Numba-compiled kernel for the intervention rules in services/intervention.py.
+Optional — only imported when numba is installed.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True, parallel=True)
+def compute_rule_mask(attendance, backlogs, gpa, study, part, assign, fin_aid, prob):
+    """
+    (N, 8) uint8 mask of which rules fired per student, columns in RULES order.
+    Float inputs may hold NaN for missing values; NaN never fires a rule.
+    """
+    n = prob.shape[0]
+    out = np.zeros((n, 8), dtype=np.uint8)
+    for i in prange(n):
+        p = prob[i]
+        out[i, 0] = 1 if p >= 0.70 else 0
+        out[i, 1] = 1 if backlogs[i] >= 3 else 0
+        out[i, 2] = 1 if attendance[i] < 50 else 0
+        out[i, 3] = 1 if gpa[i] < 4.5 else 0
+        out[i, 4] = 1 if study[i] < 5 else 0
+        out[i, 5] = 1 if part[i] < 3 else 0
+        out[i, 6] = 1 if assign[i] < 40 else 0
+        out[i, 7] = 1 if fin_aid[i] and p >= 0.5 else 0
+    return out
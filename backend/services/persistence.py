@@ -0,0 +1,78 @@
+"""
+Bulk persistence helpers shared by the batch prediction and CSV ingestion paths.
+Writes Student / Prediction / AuditLog rows with set-based INSERT statements
+instead of one ORM object per row.
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import dialect_insert
+from models.db_models import AuditLog, Prediction, Student
+
+
+def prediction_values(
+    record: dict,
+    pred: dict,
+    interventions: list[str],
+    predicted_at: datetime,
+    batch_id: Optional[str] = None,
+) -> dict:
+    """
+    Column values for one Prediction row.
+    `predicted_at` is passed in so a whole batch shares one timestamp.
+    """
+    return {
+        "student_id":                record["student_id"],
+        "attendance_pct":            record.get("attendance_pct"),
+        "assignment_score_avg":      record.get("assignment_score_avg"),
+        "internal_marks_avg":        record.get("internal_marks_avg"),
+        "semester_gpa":              record.get("semester_gpa"),
+        "study_hours_per_week":      record.get("study_hours_per_week"),
+        "participation_score":       record.get("participation_score"),
+        "prev_semester_gpa":         record.get("prev_semester_gpa"),
+        "backlogs":                  record.get("backlogs"),
+        "financial_aid":             record.get("financial_aid"),
+        "performance_category":      pred["performance_category"],
+        "dropout_probability":       pred["dropout_probability"],
+        "confidence_score":          pred["confidence"],
+        "top_factors":               pred["top_factors"],
+        "recommended_interventions": interventions,
+        "model_version":             pred["model_version"],
+        "batch_upload_id":           batch_id,
+        "predicted_at":              predicted_at,
+    }
+
+
+async def upsert_students(
+    db: AsyncSession,
+    rows: list[dict],
+    update_cols: Iterable[str] = (),
+) -> None:
+    """
+    INSERT ... ON CONFLICT (student_id) DO UPDATE for all rows in one statement.
+    Existing students get `update_cols` overwritten and `updated_at` bumped.
+    """
+    if not rows:
+        return
+    # ON CONFLICT cannot touch the same row twice in one statement → keep last
+    rows = list({r["student_id"]: r for r in rows}.values())
+
+    stmt = dialect_insert(Student)
+    set_ = {col: stmt.excluded[col] for col in update_cols}
+    set_["updated_at"] = stmt.excluded.updated_at
+    stmt = stmt.on_conflict_do_update(index_elements=[Student.student_id], set_=set_)
+    await db.execute(stmt, rows)
+
+
+async def insert_predictions(db: AsyncSession, rows: list[dict]) -> None:
+    if rows:
+        await db.execute(insert(Prediction), rows)
+
+
+async def insert_audit_logs(db: AsyncSession, rows: list[dict]) -> None:
+    if rows:
+        await db.execute(insert(AuditLog), rows)
@@ -4,13 +4,22 @@ Loads pre-fitted scaler and label encoders from ml/models/.
 """
 
 import os
+from functools import lru_cache
+from math import isnan
+from operator import itemgetter
 from typing import Any
 import joblib
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 
 from core.config import get_settings
 
+try:
+    from services.preprocessing_numba import scale_row
+except ImportError:  # numba is optional — scaler.transform is used instead
+    scale_row = None
+
 settings = get_settings()
 
 CATEGORICAL_FEATURES = ["gender", "department"]
@@ -25,63 +34,124 @@ NUMERIC_FEATURES = [
     "internal_marks_avg", "semester_gpa", "study_hours_per_week",
     "participation_score", "prev_semester_gpa", "backlogs", "financial_aid",
 ]
+NUMERIC_SET = frozenset(NUMERIC_FEATURES)  # O(1) membership on the per-record path
+# REQUIRED_FIELDS / CATEGORICAL_FEATURES need no set form: they are only ever
+# iterated in order (e.g. check_missing_ratio), never tested for membership
+
+FEATURE_DTYPE = np.dtype(settings.FEATURE_DTYPE)
+# Bounded so one large upload can't take every core from the inference pool
+PREPROCESS_N_JOBS = max(1, min(settings.PREPROCESS_N_JOBS, os.cpu_count() or 1))
 
 _scaler = None
 _label_encoders = None
 _feature_names = None
+_le_lookup = None  # {col: {category: code}}, built once from _label_encoders
 
 
+@lru_cache(maxsize=1)
 def _load_artifacts():
-    global _scaler, _label_encoders, _feature_names
+    """Load scaler, encoders and feature names once per process."""
+    global _scaler, _label_encoders, _feature_names, _le_lookup
     model_dir = settings.MODEL_DIR
     scaler_path = os.path.join(model_dir, "scaler.pkl")
     le_path    = os.path.join(model_dir, "label_encoders.pkl")
     fn_path    = os.path.join(model_dir, "feature_names.pkl")
 
-    if os.path.exists(scaler_path):
-        _scaler = joblib.load(scaler_path)
-    if os.path.exists(le_path):
+    # EAFP: a missing artifact surfaces as OSError from joblib.load, so there is
+    # no separate stat() per file
+    try:
+        # Memory-mapped read-only and used as stored (train.py saves float32
+        # statistics), so the pages are shared across inference workers
+        _scaler = joblib.load(scaler_path, mmap_mode="r")
+    except OSError:
+        _scaler = None
+
+    try:
         _label_encoders = joblib.load(le_path)
-    if os.path.exists(fn_path):
+    except OSError:
+        _label_encoders = None
+    if _label_encoders is not None:
+        # label_encoders.pkl holds plain category lists; older artifacts hold
+        # sklearn LabelEncoders, whose classes_ are read the same way
+        _le_lookup = {
+            col: {str(c): i for i, c in enumerate(getattr(enc, "classes_", enc))}
+            for col, enc in _label_encoders.items()
+        }
+
+    try:
         _feature_names = joblib.load(fn_path)
+    except OSError:
+        _feature_names = None
 
 
+# Accessors are memoized: after the first call they are a single cache hit,
+# with no None checks or filesystem probes on the request path
+@lru_cache(maxsize=1)
 def get_scaler():
-    if _scaler is None:
-        _load_artifacts()
+    _load_artifacts()
     return _scaler
 
 
+@lru_cache(maxsize=1)
 def get_label_encoders():
-    if _label_encoders is None:
-        _load_artifacts()
+    _load_artifacts()
     return _label_encoders
 
 
+@lru_cache(maxsize=1)
+def get_le_lookup() -> dict[str, dict[str, int]]:
+    """Category → code dict per categorical column (empty when no encoders are saved)."""
+    _load_artifacts()
+    return _le_lookup or {}
+
+
+@lru_cache(maxsize=1)
 def get_feature_names():
-    if _feature_names is None:
-        _load_artifacts()
+    _load_artifacts()
     return _feature_names
 
 
+@lru_cache(maxsize=1)
+def get_scaler_stats():
+    """(mean_, scale_) as plain arrays for the JIT scaling kernel, or None."""
+    scaler = get_scaler()
+    mean  = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    if mean is None or scale is None:
+        return None
+    return np.ascontiguousarray(mean), np.ascontiguousarray(scale)
+
+
+_INV_N_REQUIRED = 1.0 / len(REQUIRED_FIELDS)
+
+
+def _is_missing(val) -> bool:
+    # math.isnan instead of np.isnan: no NumPy dispatch per field. np.float64
+    # subclasses float but np.float32 does not, so check np.floating as well
+    return val is None or (isinstance(val, (float, np.floating)) and isnan(val))
+
+
 def check_missing_ratio(record: dict) -> float:
     """Return ratio of missing fields (None/NaN) out of all required fields."""
-    missing = 0
-    for field in REQUIRED_FIELDS:
-        val = record.get(field)
-        if val is None or (isinstance(val, float) and np.isnan(val)):
-            missing += 1
-    return missing / len(REQUIRED_FIELDS)
+    return sum(1 for f in REQUIRED_FIELDS if _is_missing(record.get(f))) * _INV_N_REQUIRED
 
 
-def preprocess_record(record: dict) -> np.ndarray:
+@lru_cache(maxsize=1)
+def get_feature_getter() -> tuple[itemgetter, int]:
     """
-    Preprocesses a single student record dict into a scaled feature vector.
-    Returns numpy array of shape (1, n_features).
+    (getter, n_features): a C-level itemgetter pulling an encoded row's
+    features in training order (REQUIRED_FIELDS order without feature_names.pkl).
     """
-    label_encoders = get_label_encoders()
-    scaler         = get_scaler()
-    feature_names  = get_feature_names()
+    names = get_feature_names() or [f for f in REQUIRED_FIELDS if f != "student_id"]
+    return itemgetter(*names), len(names)
+
+
+def _encode_record(record: dict) -> tuple:
+    """
+    Imputes and encodes a single student record dict.
+    Returns the raw (unscaled) feature row in training order.
+    """
+    le_lookup = get_le_lookup()
 
     row = {}
     for feat in REQUIRED_FIELDS:
@@ -90,48 +160,147 @@ def preprocess_record(record: dict) -> np.ndarray:
         val = record.get(feat)
         if val is None:
             # Impute with sensible defaults
-            if feat in NUMERIC_FEATURES:
+            if feat in NUMERIC_SET:
                 val = 0.0
             else:
                 val = "Unknown"
         row[feat] = val
 
-    # Encode categoricals
-    if label_encoders:
-        for col in CATEGORICAL_FEATURES:
-            le = label_encoders.get(col)
-            if le:
-                try:
-                    row[col] = le.transform([str(row[col])])[0]
-                except ValueError:
-                    # Unseen label → use 0
-                    row[col] = 0
+    # Encode categoricals: one dict lookup each, unseen label → 0
+    for col in CATEGORICAL_FEATURES:
+        codes = le_lookup.get(col)
+        if codes:
+            row[col] = codes.get(str(row[col]), 0)
 
     # financial_aid bool → int
     row["financial_aid"] = int(row.get("financial_aid", False))
 
-    # Build feature vector in training order
-    if feature_names:
-        X = np.array([[row[f] for f in feature_names]], dtype=float)
-    else:
-        # Fallback order
-        X = np.array([[
-            row["age"], row["gender"], row["department"], row["semester"],
-            row["attendance_pct"], row["assignment_score_avg"],
-            row["internal_marks_avg"], row["semester_gpa"],
-            row["study_hours_per_week"], row["participation_score"],
-            row["prev_semester_gpa"], row["backlogs"], row["financial_aid"],
-        ]], dtype=float)
+    # Feature row in training order
+    getter, _ = get_feature_getter()
+    return getter(row)
+
+
+def missing_ratios(df: pd.DataFrame) -> np.ndarray:
+    """Vectorized check_missing_ratio: ratio of missing required fields for every row."""
+    return df.reindex(columns=REQUIRED_FIELDS).isna().mean(axis=1).to_numpy()
+
+
+_BOOL_LITERALS = {"true": True, "false": False, "1": True, "0": False, "1.0": True, "0.0": False}
+
+
+def bool_column(raw: pd.Series) -> pd.Series:
+    """
+    A bool-like column (e.g. financial_aid) as nullable "boolean".
+    Text/numeric cells are read through _BOOL_LITERALS; nulls and
+    unparseable values (e.g. "maybe") become <NA> — never raises.
+    """
+    if pd.api.types.is_bool_dtype(raw):
+        return raw.astype("boolean")
+    return raw.astype(str).str.strip().str.lower().map(_BOOL_LITERALS).astype("boolean")
+
+
+def invalid_numeric_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Mask of rows holding a non-numeric value (e.g. "abc") in a numeric feature
+    column, or a non-bool-like value (e.g. "maybe") in financial_aid.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    for col in NUMERIC_FEATURES:
+        if col not in df.columns:
+            continue
+        raw = df[col]
+        if col == "financial_aid":
+            mask |= (bool_column(raw).isna() & raw.notna()).to_numpy()
+        elif raw.dtype == object:
+            mask |= (pd.to_numeric(raw, errors="coerce").isna() & raw.notna()).to_numpy()
+    return mask
+
 
+def preprocess_record(record: dict) -> np.ndarray:
+    """
+    Preprocesses a single student record dict into a scaled feature vector.
+    Returns numpy array of shape (1, n_features).
+    """
+    scaler = get_scaler()
+    _, n_features = get_feature_getter()
+
+    x = np.fromiter(_encode_record(record), dtype=FEATURE_DTYPE, count=n_features)
+    stats = get_scaler_stats() if scale_row is not None else None
+    if stats is not None:
+        # JIT kernel: same arithmetic as scaler.transform without sklearn's validation overhead
+        out = np.empty_like(x)
+        scale_row(x, stats[0], stats[1], out)
+        return out.reshape(1, -1)
+    X = x.reshape(1, -1)
     if scaler:
         X = scaler.transform(X)
     return X
 
 
+def preprocess_batch(records: list[dict]) -> np.ndarray:
+    """
+    Preprocesses a list of student record dicts into one scaled feature matrix.
+    The scaler runs once over the whole batch instead of once per record.
+    Returns FEATURE_DTYPE numpy array of shape (n_records, n_features).
+    """
+    scaler = get_scaler()
+    _, n_features = get_feature_getter()
+
+    # One allocation, rows written in place (no list of rows + copy)
+    X = np.empty((len(records), n_features), dtype=FEATURE_DTYPE)
+    for i, record in enumerate(records):
+        X[i] = _encode_record(record)
+    if scaler:
+        X = scaler.transform(X)
+    return X.astype(FEATURE_DTYPE, copy=False)
+
+
 def preprocess_dataframe(df: pd.DataFrame) -> np.ndarray:
-    """Batch preprocess a Pandas DataFrame. Returns feature matrix."""
-    results = []
-    for _, row in df.iterrows():
-        X = preprocess_record(row.to_dict())
-        results.append(X[0])
-    return np.array(results)
+    """
+    Batch preprocess a Pandas DataFrame with column-wise operations.
+    Same imputation/encoding as preprocess_record, without a per-row loop.
+    Very large frames are split into PREPROCESS_N_JOBS chunks and processed
+    by joblib workers; below the threshold process startup would dominate.
+    Returns FEATURE_DTYPE feature matrix of shape (len(df), n_features).
+    """
+    n_jobs = PREPROCESS_N_JOBS
+    if len(df) < settings.PREPROCESS_PARALLEL_MIN_ROWS or n_jobs == 1:
+        return _preprocess_frame(df)
+    bounds = np.linspace(0, len(df), n_jobs + 1, dtype=int)
+    parts = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_preprocess_frame)(df.iloc[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+    )
+    return np.vstack(parts)
+
+
+def _preprocess_frame(df: pd.DataFrame) -> np.ndarray:
+    scaler         = get_scaler()
+    feature_names  = get_feature_names() or [f for f in REQUIRED_FIELDS if f != "student_id"]
+
+    sub = df.reindex(columns=[f for f in REQUIRED_FIELDS if f != "student_id"])
+
+    # Numeric columns that came in as text (mixed CSV cells) → numbers
+    for col in NUMERIC_FEATURES:
+        if col != "financial_aid" and sub[col].dtype == object:
+            sub[col] = pd.to_numeric(sub[col], errors="coerce")
+
+    # financial_aid bool (object / nullable / Arrow-backed) → int, missing → 0.
+    # Through the nullable "boolean" dtype, so fillna never downcasts an object column
+    sub["financial_aid"] = bool_column(sub["financial_aid"]).fillna(False).astype(np.int8)
+
+    # Impute with sensible defaults
+    sub[NUMERIC_FEATURES] = sub[NUMERIC_FEATURES].fillna(0.0)
+
+    # Encode categoricals through the prebuilt lookup (unseen label → 0)
+    le_lookup = get_le_lookup()
+    for col in CATEGORICAL_FEATURES:
+        values = sub[col].fillna("Unknown").astype(str)
+        codes = le_lookup.get(col)
+        if codes:
+            values = values.map(codes).fillna(0).astype(np.int32)
+        sub[col] = values
+
+    X = sub[feature_names].to_numpy(dtype=FEATURE_DTYPE)
+    if scaler:
+        X = scaler.transform(X)
+    return X.astype(FEATURE_DTYPE, copy=False)
@@ -0,0 +1,13 @@
+"""
+Numba-compiled scaling kernel for the single-record path in services/preprocessing.py.
+Optional — only imported when numba is installed.
+"""
+
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def scale_row(x, mean, scale, out):
+    """out[i] = (x[i] - mean[i]) / scale[i] — StandardScaler.transform for one row."""
+    for i in range(x.shape[0]):
+        out[i] = (x[i] - mean[i]) / scale[i]
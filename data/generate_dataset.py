@@ -10,95 +10,125 @@ Output: data/students.csv
 import numpy as np
 import pandas as pd
 import os
-import random
-
-random.seed(42)
-np.random.seed(42)
 
+SEED = 42
 N = 2000
 DEPARTMENTS = ["CS", "ECE", "ME", "CE", "IT", "EE", "MBA"]
 GENDERS = ["Male", "Female", "Other"]
 
-def generate_dataset():
-    records = []
-
-    for i in range(N):
-        sid = f"STU-{2022 + (i // 500)}-{i+1:04d}"
-        age = np.random.randint(18, 28)
-        gender = np.random.choice(GENDERS, p=[0.55, 0.42, 0.03])
-        department = np.random.choice(DEPARTMENTS)
-        semester = np.random.randint(1, 9)
-        financial_aid = np.random.choice([True, False], p=[0.3, 0.7])
-
-        # ── Risk profile assignment (hidden label driver) ──────────────
-        risk_profile = np.random.choice(["high", "medium", "low"], p=[0.25, 0.40, 0.35])
-
-        if risk_profile == "low":
-            attendance_pct       = np.clip(np.random.normal(85, 8),  60, 100)
-            assignment_score_avg = np.clip(np.random.normal(78, 8),  50, 100)
-            internal_marks_avg   = np.clip(np.random.normal(76, 8),  50, 100)
-            semester_gpa         = np.clip(np.random.normal(8.2, 0.7), 6.0, 10.0)
-            study_hours          = np.clip(np.random.normal(22, 5),  10, 50)
-            participation_score  = np.clip(np.random.normal(7.5, 1.2), 4, 10)
-            prev_semester_gpa    = np.clip(semester_gpa + np.random.normal(0, 0.3), 5.0, 10.0)
-            backlogs             = np.random.choice([0, 1], p=[0.92, 0.08])
-
-        elif risk_profile == "medium":
-            attendance_pct       = np.clip(np.random.normal(72, 10), 50, 90)
-            assignment_score_avg = np.clip(np.random.normal(62, 10), 40, 85)
-            internal_marks_avg   = np.clip(np.random.normal(60, 10), 40, 82)
-            semester_gpa         = np.clip(np.random.normal(6.5, 0.8), 4.5, 8.5)
-            study_hours          = np.clip(np.random.normal(14, 5),  5, 30)
-            participation_score  = np.clip(np.random.normal(5.5, 1.5), 2, 8)
-            prev_semester_gpa    = np.clip(semester_gpa + np.random.normal(-0.2, 0.4), 4.0, 9.0)
-            backlogs             = np.random.choice([0, 1, 2, 3], p=[0.50, 0.30, 0.15, 0.05])
-
-        else:  # high risk
-            attendance_pct       = np.clip(np.random.normal(50, 12), 20, 75)
-            assignment_score_avg = np.clip(np.random.normal(44, 12), 20, 65)
-            internal_marks_avg   = np.clip(np.random.normal(42, 12), 20, 62)
-            semester_gpa         = np.clip(np.random.normal(4.2, 1.0), 2.0, 6.5)
-            study_hours          = np.clip(np.random.normal(7, 4),   1, 20)
-            participation_score  = np.clip(np.random.normal(3.2, 1.5), 0, 6)
-            prev_semester_gpa    = np.clip(semester_gpa + np.random.normal(-0.5, 0.5), 2.0, 7.5)
-            backlogs             = np.random.choice([0, 1, 2, 3, 4, 5], p=[0.10, 0.15, 0.20, 0.25, 0.20, 0.10])
-
-        # ── Derive performance category label ─────────────────────────
-        score = (
-            0.30 * (attendance_pct / 100) +
-            0.20 * (semester_gpa / 10) +
-            0.15 * (assignment_score_avg / 100) +
-            0.15 * (internal_marks_avg / 100) +
-            0.10 * (study_hours / 50) +
-            0.10 * max(0, (1 - backlogs / 5))
+# ── Risk profiles (hidden label driver) ────────────────────────────────────────
+# Clipped normals as (mean, std, lo, hi); prev_semester_gpa is semester_gpa plus
+# N(mean, std), clipped; backlogs as (values, probabilities)
+PROFILES = {
+    "low": {
+        "attendance_pct":       (85, 8, 60, 100),
+        "assignment_score_avg": (78, 8, 50, 100),
+        "internal_marks_avg":   (76, 8, 50, 100),
+        "semester_gpa":         (8.2, 0.7, 6.0, 10.0),
+        "study_hours":          (22, 5, 10, 50),
+        "participation_score":  (7.5, 1.2, 4, 10),
+        "prev_semester_gpa":    (0, 0.3, 5.0, 10.0),
+        "backlogs":             ([0, 1], [0.92, 0.08]),
+    },
+    "medium": {
+        "attendance_pct":       (72, 10, 50, 90),
+        "assignment_score_avg": (62, 10, 40, 85),
+        "internal_marks_avg":   (60, 10, 40, 82),
+        "semester_gpa":         (6.5, 0.8, 4.5, 8.5),
+        "study_hours":          (14, 5, 5, 30),
+        "participation_score":  (5.5, 1.5, 2, 8),
+        "prev_semester_gpa":    (-0.2, 0.4, 4.0, 9.0),
+        "backlogs":             ([0, 1, 2, 3], [0.50, 0.30, 0.15, 0.05]),
+    },
+    "high": {
+        "attendance_pct":       (50, 12, 20, 75),
+        "assignment_score_avg": (44, 12, 20, 65),
+        "internal_marks_avg":   (42, 12, 20, 62),
+        "semester_gpa":         (4.2, 1.0, 2.0, 6.5),
+        "study_hours":          (7, 4, 1, 20),
+        "participation_score":  (3.2, 1.5, 0, 6),
+        "prev_semester_gpa":    (-0.5, 0.5, 2.0, 7.5),
+        "backlogs":             ([0, 1, 2, 3, 4, 5], [0.10, 0.15, 0.20, 0.25, 0.20, 0.10]),
+    },
+}
+# Output precision per drawn feature (rounded once, column-wise, after scoring)
+DECIMALS = {
+    "attendance_pct": 2, "assignment_score_avg": 2, "internal_marks_avg": 2,
+    "semester_gpa": 2, "study_hours": 1, "participation_score": 2, "prev_semester_gpa": 2,
+}
+CLIPPED_FEATURES = [
+    "attendance_pct", "assignment_score_avg", "internal_marks_avg",
+    "semester_gpa", "study_hours", "participation_score",
+]
+
+def generate_dataset(seed: int = SEED):
+    # PCG64 generator passed explicitly instead of the legacy global MT19937 state
+    rng = np.random.default_rng(seed)
+
+    # STU-<intake year>-<serial>, built column-wise (500 students per intake year)
+    serial = np.arange(1, N + 1)
+    year = (2022 + (serial - 1) // 500).astype(str)
+    sid = np.char.add(np.char.add("STU-", year), np.char.add("-", np.char.zfill(serial.astype(str), 4)))
+
+    # Every feature is drawn for the whole cohort (or one profile's rows) at once
+    age = rng.integers(18, 28, size=N, dtype=np.int8)
+    gender = rng.choice(GENDERS, size=N, p=[0.55, 0.42, 0.03])
+    department = rng.choice(DEPARTMENTS, size=N)
+    semester = rng.integers(1, 9, size=N, dtype=np.int8)
+    financial_aid = rng.choice([True, False], size=N, p=[0.3, 0.7])
+    risk_profile = rng.choice(["high", "medium", "low"], size=N, p=[0.25, 0.40, 0.35])
+
+    features = {name: np.empty(N) for name in CLIPPED_FEATURES + ["prev_semester_gpa"]}
+    backlogs = np.empty(N, dtype=np.int8)
+    for profile, params in PROFILES.items():
+        mask = risk_profile == profile
+        n = int(mask.sum())
+        for name in CLIPPED_FEATURES:
+            mean, std, lo, hi = params[name]
+            features[name][mask] = np.clip(rng.normal(mean, std, n), lo, hi)
+        mean, std, lo, hi = params["prev_semester_gpa"]
+        features["prev_semester_gpa"][mask] = np.clip(
+            features["semester_gpa"][mask] + rng.normal(mean, std, n), lo, hi
         )
-
-        if score >= 0.68:
-            performance_category = "High"
-        elif score >= 0.48:
-            performance_category = "Medium"
-        else:
-            performance_category = "At Risk"
-
-        records.append({
-            "student_id":           sid,
-            "age":                  age,
-            "gender":               gender,
-            "department":           department,
-            "semester":             semester,
-            "attendance_pct":       round(attendance_pct, 2),
-            "assignment_score_avg": round(assignment_score_avg, 2),
-            "internal_marks_avg":   round(internal_marks_avg, 2),
-            "semester_gpa":         round(semester_gpa, 2),
-            "study_hours_per_week": round(study_hours, 1),
-            "participation_score":  round(participation_score, 2),
-            "prev_semester_gpa":    round(prev_semester_gpa, 2),
-            "backlogs":             int(backlogs),
-            "financial_aid":        financial_aid,
-            "performance_category": performance_category,
-        })
-
-    df = pd.DataFrame(records)
+        values, probs = params["backlogs"]
+        backlogs[mask] = rng.choice(values, size=n, p=probs)
+
+    # ── Derive performance category label ─────────────────────────────
+    score = (
+        0.30 * (features["attendance_pct"] / 100) +
+        0.20 * (features["semester_gpa"] / 10) +
+        0.15 * (features["assignment_score_avg"] / 100) +
+        0.15 * (features["internal_marks_avg"] / 100) +
+        0.10 * (features["study_hours"] / 50) +
+        0.10 * np.maximum(0, (1 - backlogs / 5))
+    )
+    # Thresholds 0.48 / 0.68 → codes 0 / 1 / 2 in one pass, straight into a categorical column
+    performance_category = pd.Categorical.from_codes(
+        np.digitize(score, [0.48, 0.68]), categories=["At Risk", "Medium", "High"]
+    )
+
+    # Round in place: one C-level pass per column, no temporaries
+    for name, decimals in DECIMALS.items():
+        np.round(features[name], decimals, out=features[name])
+
+    # Frame straight from typed column arrays — no per-row dtype inference
+    df = pd.DataFrame({
+        "student_id":           sid,
+        "age":                  age,
+        "gender":               gender,
+        "department":           department,
+        "semester":             semester,
+        "attendance_pct":       features["attendance_pct"],
+        "assignment_score_avg": features["assignment_score_avg"],
+        "internal_marks_avg":   features["internal_marks_avg"],
+        "semester_gpa":         features["semester_gpa"],
+        "study_hours_per_week": features["study_hours"],
+        "participation_score":  features["participation_score"],
+        "prev_semester_gpa":    features["prev_semester_gpa"],
+        "backlogs":             backlogs,
+        "financial_aid":        financial_aid,
+        "performance_category": performance_category,
+    })
 
     os.makedirs("data", exist_ok=True)
     df.to_csv("data/students.csv", index=False)